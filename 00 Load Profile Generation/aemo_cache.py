@@ -0,0 +1,142 @@
+'''
+Binary cache for the AEMO 5 minute PRICE_AND_DEMAND_YYYYMM_QLD1.csv files.
+
+Each monthly CSV is parsed once into a .npy array of (timestamp, TOTALDEMAND)
+records in a cache folder next to the CSVs. The arrays are memory-mapped on
+later runs, so only new or changed CSV files (by size and modification time)
+are parsed again. Files are parsed in parallel with a thread pool and months
+are ordered by their first timestamp rather than by os.listdir order.
+
+Demand can be read as hourly means of each month's 5 minute data or at
+30 or 5 minute resolution.
+'''
+
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+import json
+import os
+
+cache_folder_name = '.aemo_cache'
+demand_dtype = np.dtype([('time', 'datetime64[s]'), ('demand', 'f8')])
+
+def csv_to_array(filename):
+    # PARSE ONE MONTHLY CSV INTO A RECORD ARRAY
+    df = pd.read_csv(filename, usecols=['SETTLEMENTDATE', 'TOTALDEMAND'])
+
+    month = np.empty(len(df), dtype=demand_dtype)
+    month['time'] = pd.to_datetime(df['SETTLEMENTDATE'],
+                                   format='%Y/%m/%d %H:%M:%S').to_numpy()
+    month['demand'] = df['TOTALDEMAND'].to_numpy(dtype=float)
+
+    return month
+
+def file_stamp(filename):
+    stat = os.stat(filename)
+    return [stat.st_size, stat.st_mtime_ns]
+
+def ingest(folder_path, threads=os.cpu_count()):
+    # CONVERT NEW OR CHANGED CSV FILES IN folder_path TO .npy FILES
+    # Returns the manifest of {csv filename: cache entry}
+    cache_folder = os.path.join(folder_path, cache_folder_name)
+    os.makedirs(cache_folder, exist_ok=True)
+    manifest_json = os.path.join(cache_folder, 'manifest.json')
+
+    manifest = {}
+    if os.path.exists(manifest_json):
+        with open(manifest_json) as f:
+            manifest = json.load(f)
+
+    csv_files = sorted(filename for filename in os.listdir(folder_path)
+                       if filename.endswith(".csv"))
+
+    stale_files = [filename for filename in csv_files
+                   if filename not in manifest
+                   or manifest[filename]['stamp'] !=
+                      file_stamp(os.path.join(folder_path, filename))
+                   or not os.path.exists(os.path.join(
+                       cache_folder, manifest[filename]['npy']))]
+
+    def ingest_file(filename):
+        filepath = os.path.join(folder_path, filename)
+        stamp = file_stamp(filepath)
+        month = csv_to_array(filepath)
+
+        npy_name = filename.replace('.csv', '.npy')
+        np.save(os.path.join(cache_folder, npy_name), month)
+
+        return filename, {'stamp': stamp, 'npy': npy_name,
+                          'start': str(month['time'][0])}
+
+    if stale_files:
+        with ThreadPoolExecutor(threads) as pool:
+            for filename, entry in pool.map(ingest_file, stale_files):
+                manifest[filename] = entry
+
+    # Forget CSV files that have been removed from the folder
+    manifest = {filename: manifest[filename] for filename in csv_files}
+
+    with open(manifest_json, 'w') as f:
+        json.dump(manifest, f, indent=4)
+
+    return manifest
+
+def load_months(folder_path):
+    # MEMORY-MAPPED MONTH ARRAYS, ORDERED BY THEIR FIRST TIMESTAMP
+    manifest = ingest(folder_path)
+    cache_folder = os.path.join(folder_path, cache_folder_name)
+
+    entries = sorted(manifest.values(), key=lambda entry: entry['start'])
+
+    return [np.load(os.path.join(cache_folder, entry['npy']), mmap_mode='r')
+            for entry in entries]
+
+def hourly_demand(folder_path):
+    # HOURLY MEAN DEMAND (MW) FOR ALL MONTHS IN folder_path
+    # Same as resampling each month to hourly means and dropping its last row
+    # (the first hour of the next month)
+    hours = []
+    demand = []
+
+    for month in load_months(folder_path):
+        month_hours = month['time'].astype('datetime64[h]')
+
+        # Remove the last hour (next month's data)
+        keep = month_hours < month_hours[-1]
+        hours.append(month_hours[keep])
+        demand.append(month['demand'][keep])
+
+    # Mean of each hour. Timestamps are floored to the hour, giving the same
+    # bins as resample("1H")
+    return binned_mean(np.concatenate(hours), np.concatenate(demand))
+
+def sub_hourly_demand(folder_path, resolution_minutes=30):
+    # MEAN DEMAND (MW) FOR EACH 5 OR 30 MINUTE STEP
+    # SETTLEMENTDATE is the end of each 5 minute interval, so steps are
+    # labelled by the interval start. Each month's last record (00:00 of the
+    # next month) is then that month's final interval and the year has a
+    # complete 17,520 (30 min) or 105,120 (5 min) steps
+    months = load_months(folder_path)
+    times = np.concatenate([month['time'] for month in months])
+    demand = np.concatenate([month['demand'] for month in months])
+
+    minutes = (times - np.timedelta64(5, 'm')).astype('datetime64[m]')
+    minutes = minutes.astype(np.int64)
+    steps = (minutes - minutes % resolution_minutes).astype('datetime64[m]')
+
+    return binned_mean(steps, demand)
+
+def demand_at_resolution(folder_path, resolution_minutes=60):
+    if resolution_minutes == 60:
+        return hourly_demand(folder_path)
+
+    return sub_hourly_demand(folder_path, resolution_minutes)
+
+def binned_mean(bins, demand):
+    # MEAN DEMAND OF EACH UNIQUE BIN, AS A DataFrame INDEXED BY BIN
+    unique_bins, bin_idx = np.unique(bins, return_inverse=True)
+    binned = np.bincount(bin_idx, weights=demand) / np.bincount(bin_idx)
+
+    return pd.DataFrame({'TOTALDEMAND': binned},
+                        index=pd.DatetimeIndex(unique_bins,
+                                               name='SETTLEMENTDATE'))
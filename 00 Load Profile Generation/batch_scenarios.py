@@ -0,0 +1,106 @@
+'''
+Batch mode for ev_load_engine.py.
+
+Computes every combination of coordinated charging profile (profile_csvs in
+constants1.py) and flex percentage column (percentages_csv) as one stacked
+(scenario x hour) array and writes a load CSV for each scenario in a single
+run, instead of editing constants1.py and rerunning once per scenario.
+
+Output files are written to batch_output_folder/<profile>/ and use the same
+naming and format as export_csv.
+'''
+
+from constants1 import *
+import ev_load_engine as engine
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+import os
+import re
+
+def profile_loads(profile_weekday_csv, profile_weekend_csv, shares):
+    # EV LOADS FOR ONE CHARGING PROFILE AND EVERY ROW OF shares
+    # Returns array of shape (flex column, hour)
+    day_profiles = engine.day_profile_array(profile_weekday_csv,
+                                            profile_weekend_csv)
+
+    return engine.ev_year_profile_MW(day_profiles, shares)
+
+def scenario_loads(profiles=profile_csvs, percentages_csv=percentages_csv,
+                   qld_loads_csv=total_qld_loads, processes=1):
+    # STACK EVERY (PROFILE, FLEX COLUMN) SCENARIO INTO ONE ARRAY
+    # Returns list of (profile, flex column) and array of shape (scenario, hour)
+    flex_cols, shares = engine.charge_type_share_table(percentages_csv)
+
+    # Each profile is parsed and computed independently, so large profile
+    # sets can be spread over a process pool
+    if processes > 1 and len(profiles) > 1:
+        with ProcessPoolExecutor(min(processes, len(profiles))) as pool:
+            futures = [pool.submit(profile_loads, wd_csv, we_csv, shares)
+                       for wd_csv, we_csv in profiles.values()]
+            ev_loads = [future.result() for future in futures]
+    else:
+        ev_loads = [profile_loads(wd_csv, we_csv, shares)
+                    for wd_csv, we_csv in profiles.values()]
+
+    # COMBINE RES EV LOAD PROFILES WITH TOTAL QLD LOAD PROFILE
+    qld_loads = pd.read_csv(qld_loads_csv)['Load (MW)'].to_numpy()
+    loads = np.concatenate(ev_loads) + qld_loads
+
+    scenarios = [(profile, flex_col) for profile in profiles
+                 for flex_col in flex_cols]
+
+    return scenarios, loads
+
+def charge_type_loads(profiles=profile_csvs, percentages_csv=percentages_csv):
+    # EV LOAD OF EACH CHARGE TYPE IN EVERY (PROFILE, FLEX COLUMN) SCENARIO
+    # Returns list of (profile, flex column), the charge type names and array
+    # of shape (scenario, charge type, hour), which sums over charge types to
+    # the EV part of scenario_loads()
+    flex_cols, shares = engine.charge_type_share_table(percentages_csv)
+
+    ev_loads = [engine.ev_charge_type_profiles_MW(
+                    engine.day_profile_array(wd_csv, we_csv), shares)
+                for wd_csv, we_csv in profiles.values()]
+
+    scenarios = [(profile, flex_col) for profile in profiles
+                 for flex_col in flex_cols]
+
+    return (scenarios, engine.charge_type_names(percentages_csv),
+            np.concatenate(ev_loads))
+
+def flex_label(flex_col):
+    # "30% Flex" -> "30", other column names (e.g. "CSIRO") are kept as is
+    match = re.match(r'\d+(\.\d+)?', flex_col)
+
+    return match.group() if match else flex_col
+
+def write_load_csv(export_path, load):
+    pd.DataFrame({'Load (MW)': load}).to_csv(export_path, index=False)
+
+def export_scenarios(scenarios, loads, output_folder=batch_output_folder,
+                     processes=1):
+    # WRITE ONE CSV PER SCENARIO, GROUPED INTO A FOLDER PER PROFILE
+    export_paths = []
+
+    for profile, flex_col in scenarios:
+        profile_folder = os.path.join(output_folder, profile)
+        os.makedirs(profile_folder, exist_ok=True)
+
+        filename = f"{todays_date}_{year}_loads_{flex_label(flex_col)}_flex.csv"
+        export_paths.append(os.path.join(profile_folder, filename))
+
+    # Formatting the CSV text is the slowest part of a batch run
+    if processes > 1:
+        with ProcessPoolExecutor(processes) as pool:
+            list(pool.map(write_load_csv, export_paths, loads))
+    else:
+        for export_path, load in zip(export_paths, loads):
+            write_load_csv(export_path, load)
+
+    return export_paths
+
+
+if __name__ == "__main__":
+    scenarios, loads = scenario_loads()
+    export_scenarios(scenarios, loads, processes=os.cpu_count())
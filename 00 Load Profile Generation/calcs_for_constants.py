@@ -2,22 +2,32 @@
 Author: Gabriella Vidgen
 Date: 4 May 2023
 
-Functions to print outputs to copy-paste into constants1.py to reduce the 
-runtime of charge_profile_sorting6.py
+Functions to calculate the solar scales and weekday/weekend counts used by
+charge_profile_sorting6.py. Daily solar scales (one per day of the year,
+used when solar_scaling = "daily" in constants1.py) are also calculated.
+
+constants1.py gets these values from derived_constants(), which caches them
+on disk keyed by the contents of the solar CSV and the year, so the solar CSV
+is only parsed again when it (or the year) changes. Running this script
+prints the values as before.
 '''
 
 import pandas as pd
 import numpy as np
 import datetime
+import hashlib
+import json
+import os
 
 solar_csv = 'QLD_solar_var_timestamps.csv'
+cache_json = 'constants_cache.json'
 
-def solar_months(solar_csv):
+def solar_month_scales(solar_csv):
     df = pd.read_csv(solar_csv)
 
     # extract month and create new column
     df['month'] = pd.DatetimeIndex(df['time'], dayfirst=True).month
-    
+
     month_averages = []
     for i in range(1, 13):
         month_data = df.loc[df['month']==i]
@@ -30,19 +40,44 @@ def solar_months(solar_csv):
 
     month_scales = []
     for num, day in zip(month_averages, month_days):
-        month_scales.append((day/sum(month_days)) * (num/avg) * 12)
+        month_scales.append(float((day/sum(month_days)) * (num/avg) * 12))
+
+    return month_scales
+
+def solar_day_scales(solar_csv, year):
+    df = pd.read_csv(solar_csv)
+    dates = pd.DatetimeIndex(df['time'], dayfirst=True)
+
+    # average of every day in one groupby, normalised to the average day
+    day_averages = df['electricity'].groupby([dates.month, dates.day]).mean()
+    day_scales = day_averages / day_averages.mean()
+
+    # map onto the days of year (29 February uses 28 February)
+    days = pd.date_range(f'{year}-01-01', f'{year}-12-31', freq='D')
+    month_days = np.where((days.month == 2) & (days.day == 29), 28, days.day)
+
+    return [float(scale) for scale in
+            day_scales.loc[list(zip(days.month, month_days))]]
+
+def solar_months(solar_csv):
+    month_scales = solar_month_scales(solar_csv)
 
     print(month_scales)
     print(sum(month_scales))
 
-def weekday_weekend_ratio(year, count=False, ratio=False):
+def day_counts(year):
     # GET TOTAL NUMBER OF WEEKDAYS AND WEEKENDS FOR YEAR
     start_date = datetime.date(year, 1, 1)
     end_date = datetime.date(year, 12, 31)
-    weekday_count = sum(1 for i in range((end_date - start_date).days + 1) 
+    weekday_count = sum(1 for i in range((end_date - start_date).days + 1)
                         if (start_date + datetime.timedelta(i)).weekday() < 5)
     weekend_count = (end_date - start_date).days + 1 - weekday_count
 
+    return weekday_count, weekend_count
+
+def weekday_weekend_ratio(year, count=False, ratio=False):
+    weekday_count, weekend_count = day_counts(year)
+
     # GET RATIO OF WEEKDAYS AND WEEKENDS FOR YEAR
     weekday_ratio = weekday_count/(weekday_count + weekend_count)
     weekend_ratio = 1 - weekday_ratio
@@ -51,10 +86,44 @@ def weekday_weekend_ratio(year, count=False, ratio=False):
         print(weekday_count)
         print(weekend_count)
         return weekday_count, weekend_count
-    
+
     elif ratio == True:
         print(weekday_ratio)
         print(weekend_ratio)
         return weekday_ratio, weekend_ratio
 
-solar_months(solar_csv)
+def file_hash(filename):
+    with open(filename, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+def derived_constants(solar_csv=solar_csv, year=2050, cache_json=cache_json):
+    # SOLAR SCALES AND WEEKDAY/WEEKEND VALUES FOR year, CACHED ON DISK
+    cache_key = f'{file_hash(solar_csv)}_{year}'
+
+    cache = {}
+    if os.path.exists(cache_json):
+        with open(cache_json) as f:
+            cache = json.load(f)
+
+    # Older cache entries don't have the daily scales
+    if 'solar_day_scales' not in cache.get(cache_key, {}):
+        weekday_count, weekend_count = day_counts(year)
+        weekday_ratio = weekday_count/(weekday_count + weekend_count)
+
+        cache[cache_key] = {
+            'solar_scales': solar_month_scales(solar_csv),
+            'solar_day_scales': solar_day_scales(solar_csv, year),
+            'weekday_count': weekday_count,
+            'weekend_count': weekend_count,
+            'weekday_ratio': weekday_ratio,
+            'weekend_ratio': 1 - weekday_ratio,
+        }
+
+        with open(cache_json, 'w') as f:
+            json.dump(cache, f, indent=4)
+
+    return cache[cache_key]
+
+
+if __name__ == '__main__':
+    solar_months(solar_csv)
@@ -5,6 +5,9 @@ Date: 4 May 2023
 Constants for importing into charge_profile_sorting6.py
 '''
 
+from calcs_for_constants import derived_constants
+import os
+
 todays_date = '230518' # YYMMDD
 
 # IMPORTED FILE NAMES
@@ -14,28 +17,53 @@ percentages_csv = "230504_percentages.csv"
 # percentages_csv = "CSIRO_original_percentages.csv"
 total_qld_loads = "QLD_loads_2050_no_res_EVs1.csv" # ALTER
 
+# COORDINATED CHARGING PROFILES FOR BATCH RUNS: (weekday csv, weekend csv)
+profile_csvs = {
+    "Day Peak": ("2040_weekday_residential_profiles1.csv",
+                 "2040_weekend_residential_profiles1.csv"),
+    "Day and Night Peaks": ("2040_weekday_residential_profiles2.csv",
+                            "2040_weekend_residential_profiles2.csv"),
+}
+batch_output_folder = "Batch Loads"
+
+# GENX CASES
+genx_cases_folder = "../01 GenX Cases"
+profile_case_folders = {"Day Peak": "01 Day Peak",
+                        "Day and Night Peaks": "02 Day and Night Peaks"}
+load_data_template = f"{genx_cases_folder}/01 Day Peak/230515_30_flex/Load_data.csv"
+
 percent_flex = 50 # ALTER
+resolution_minutes = 60 # 60, 30 or 5 (multi_year.py)
 
 # VALUES SPECIFIC TO 2050
 year = 2050
 total_GWh = 9545    
 vehicle_sizes_GWh = {"Small": 2623, "Medium": 3418, "Large": 3504}
 
-# From calcs_for_constants.py
-weekday_count = 260
-weekend_count = 105
-weekday_ratio = 0.7123287671232876
-weekend_ratio = 0.28767123287671237
+# TARGET YEARS FOR multi_year.py: consumption and EV energy for each year
+target_years_csv = "target_years.csv"
+
+# From calcs_for_constants.py (recomputed whenever the solar CSV or year
+# changes, otherwise read from the cache file)
+solar_csv = "QLD_solar_var_timestamps.csv"
+_folder = os.path.dirname(os.path.abspath(__file__))
+_derived = derived_constants(os.path.join(_folder, solar_csv), year,
+                             os.path.join(_folder, "constants_cache.json"))
+
+weekday_count = _derived['weekday_count']
+weekend_count = _derived['weekend_count']
+weekday_ratio = _derived['weekday_ratio']
+weekend_ratio = _derived['weekend_ratio']
+solar_scales = _derived['solar_scales']
+solar_day_scales = _derived['solar_day_scales']
+
+# "monthly": coordinated charging share scaled by solar_scales (one per month)
+# "daily": scaled by solar_day_scales (one per day, ev_load_engine.py)
+solar_scaling = "monthly" # ALTER
 
 # GENERAL VALUES
 month_days = [31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31]
 
-# From calcs_for_constants.py
-solar_scales = [1.0933332601166563, 0.9753339063066112, 0.9046930771032093, 
-                0.9741283310496434, 0.8881737556552943, 0.7928392166762441, 
-                0.9548332460832463, 1.0644170965141648, 1.101801691189991, 
-                1.094491788534328, 1.0844649309093028, 1.065352152445179]
-
 # EXPORTING FILENAME
 export_csv = f"{todays_date}_{year}_loads_{percent_flex}_flex.csv"
 # export_csv = f"{year}_res_EV_loads_{percent_flex}2.csv"
@@ -0,0 +1,258 @@
+'''
+Vectorised replacement for the per-day loop in charge_profile_sorting6.py.
+
+The CSIRO profile CSVs and the percentages CSV are parsed once, combined into
+a (month x day type x 24) template tensor of MW values, and the full year is
+assembled by indexing that template with a precomputed calendar of
+(month, day type) pairs for every day of the year.
+
+With solar_scaling = "daily" the coordinated charging share follows each
+day's solar output instead of the month's: the template then has one entry
+per day of the year (day x day type x 24) and is indexed by each day's
+(day, day type).
+
+Running this script produces the same export_csv as
+charge_profile_sorting6.year_profile_MW().
+'''
+
+from constants1 import *
+from charge_profile_sorting6 import csv_to_size_categories
+from calcs_for_constants import solar_day_scales as year_day_scales
+import constants1
+import numpy as np
+import pandas as pd
+import math
+
+DAY_TYPES = ["weekday", "weekend"] # Order of the day type axis
+STEPS_PER_HOUR = {60: 1, 30: 2, 5: 12} # Supported resolutions (minutes)
+
+def sub_hourly_size_categories(input_csv, resolution_minutes):
+    # KEEP THE HALF-HOURLY CSIRO DATA INSTEAD OF AVERAGING TO HOURS
+    # 5 minute steps repeat each half-hour's value
+    df = pd.read_csv(input_csv).drop(columns="Time")
+    df = df.loc[df.index.repeat(30 // resolution_minutes)]
+
+    # NORMALISE EACH CHARGING PROFILE, as in csv_to_size_categories()
+    for col_name in df.columns:
+        normalised_col = df[col_name] / df[col_name].sum()
+        df[col_name] = normalised_col / normalised_col.sum()
+
+    # SPLIT DATA INTO VEHICLE SIZE CATEGORIES
+    sml_df = df.filter(regex="Small")
+    med_df = df.filter(regex="Medium")
+    lrg_df = df.filter(regex="Large")
+
+    return sml_df, med_df, lrg_df
+
+def size_profile_array(input_csv, resolution_minutes=60):
+    # PARSE A CSIRO PROFILE CSV ONCE
+    # Returns array of shape (size, charge type, step of day) ordered Small,
+    # Medium, Large to match vehicle_sizes_GWh
+    if resolution_minutes not in STEPS_PER_HOUR:
+        raise ValueError(f"resolution_minutes must be one of "
+                         f"{list(STEPS_PER_HOUR)}, not {resolution_minutes}")
+
+    if resolution_minutes == 60:
+        size_dfs = csv_to_size_categories(input_csv)
+    else:
+        size_dfs = sub_hourly_size_categories(input_csv, resolution_minutes)
+
+    return np.stack([size_df.to_numpy(dtype=float).T for size_df in size_dfs])
+
+def day_profile_array(weekday_csv=weekday_csv, weekend_csv=weekend_csv,
+                      resolution_minutes=60):
+    # STACK WEEKDAY AND WEEKEND PROFILES
+    # Returns array of shape (day type, size, charge type, step of day)
+    return np.stack([size_profile_array(weekday_csv, resolution_minutes),
+                     size_profile_array(weekend_csv, resolution_minutes)])
+
+def charge_type_shares(percentages_csv=percentages_csv,
+                       percent_flex=percent_flex):
+    # GET THE CHARGE TYPE PERCENTAGES FOR A percent_flex COLUMN
+    # Same column selection and rounding as charge_type_percentages()
+    percentages_df = pd.read_csv(percentages_csv)
+    percent_col_name = percentages_df.filter(regex=str(percent_flex)).columns[0]
+
+    shares = [float('{:.8f}'.format(value))
+              for value in percentages_df[percent_col_name]
+              if not math.isnan(value)]
+
+    return np.array(shares)
+
+def charge_type_share_table(percentages_csv=percentages_csv):
+    # GET THE CHARGE TYPE PERCENTAGES FOR EVERY COLUMN OF percentages_csv
+    # Returns the column names and an array of shape (column, charge type)
+    percentages_df = pd.read_csv(percentages_csv)
+    percent_col_names = list(percentages_df.columns[1:])
+
+    shares = [[float('{:.8f}'.format(value))
+               for value in percentages_df[col_name]
+               if not math.isnan(value)]
+              for col_name in percent_col_names]
+
+    return percent_col_names, np.array(shares)
+
+def charge_type_names(percentages_csv=percentages_csv):
+    # NAMES OF THE CHARGE TYPES, in the order of the shares
+    percentages_df = pd.read_csv(percentages_csv)
+    has_share = percentages_df.iloc[:, 1:].notna().any(axis=1)
+
+    return list(percentages_df.loc[has_share, 'Charge Type'])
+
+def month_share_matrix(shares, scales=solar_scales):
+    # SCALE COORDINATED CHARGING SHARE BY EACH MONTH'S SOLAR SCALE
+    # shares: (..., charge type), coordinated charging last
+    # scales: (..., month)
+    # Returns array of shape (..., month, charge type)
+    shares = np.asarray(shares, dtype=float)[..., np.newaxis, :]
+    scales = np.asarray(scales, dtype=float)[..., np.newaxis]
+
+    coord_share = shares[..., -1:] * scales
+
+    # Adjust other percentages based on scaled solar. Sums are accumulated
+    # in the same order as charge_type_percentages() so results are identical
+    remaining_scale = 1 - coord_share
+    static_sum = 0
+    for i in range(shares.shape[-1] - 1):
+        static_sum = static_sum + shares[..., i:i+1]
+
+    # With 100% coordinated charging there are no other shares to rescale
+    static_scale = np.divide(remaining_scale, static_sum,
+                             out=np.zeros(np.broadcast_shapes(
+                                 remaining_scale.shape, static_sum.shape)),
+                             where=static_sum != 0)
+    static_shares = shares[..., :-1] * static_scale
+
+    return np.concatenate([static_shares, coord_share], axis=-1)
+
+def template_tensor(day_profiles, month_shares,
+                    sizes_GWh=list(vehicle_sizes_GWh.values()),
+                    day_ratios=(weekday_ratio, weekend_ratio),
+                    day_counts=(weekday_count, weekend_count),
+                    steps_per_hour=1):
+    # COMBINE PROFILES AND SHARES INTO MW FOR EVERY MONTH AND DAY TYPE
+    # day_profiles: (day type, size, charge type, step of day)
+    # month_shares: (..., month, charge type)
+    # sizes_GWh: (..., size), day_ratios and day_counts: (..., day type)
+    # Leading axes (e.g. scenario or target year) broadcast together
+    # Returns array of shape (..., month, day type, step of day)
+    month_shares = np.asarray(month_shares, dtype=float)
+    sizes_GWh = np.asarray(sizes_GWh, dtype=float)
+    day_ratios = np.asarray(day_ratios, dtype=float)[..., np.newaxis, :,
+                                                     np.newaxis]
+    day_counts = np.asarray(day_counts, dtype=float)[..., np.newaxis, :,
+                                                     np.newaxis]
+
+    template = 0
+    for size in range(sizes_GWh.shape[-1]):
+        size_res_GWh = sizes_GWh[..., size, np.newaxis, np.newaxis, np.newaxis]
+
+        # Superimpose each charge type multiplied by its percentage
+        superimposed = 0
+        for charge_type in range(month_shares.shape[-1]):
+            share = month_shares[..., :, np.newaxis, charge_type, np.newaxis]
+            superimposed = superimposed + \
+                           day_profiles[:, size, charge_type, :] * share
+
+        # GenX requires load inputs to be MW
+        template = template + (superimposed * day_ratios * size_res_GWh *
+                               1000 / day_counts) # GWh to MWh
+
+    # Sub-hourly profiles give MWh per step
+    if steps_per_hour != 1:
+        template = template * steps_per_hour
+
+    return template
+
+def year_calendar(year=year):
+    # MONTH (0-11) AND DAY TYPE (0=weekday, 1=weekend) OF EVERY DAY IN YEAR
+    days = np.arange(f'{year}-01-01', f'{year + 1}-01-01',
+                     dtype='datetime64[D]')
+
+    month_idx = days.astype('datetime64[M]').astype(int) % 12
+    weekday = (days.astype(int) + 3) % 7 # 1 Jan 1970 was a Thursday
+    day_type_idx = (weekday >= 5).astype(int) # Monday = 0, Sunday = 6
+
+    return month_idx, day_type_idx
+
+def day_calendar(year=year):
+    # DAY (0-364/365) AND DAY TYPE OF EVERY DAY, for templates made with one
+    # scale per day
+    _, day_type_idx = year_calendar(year)
+
+    return np.arange(len(day_type_idx)), day_type_idx
+
+def solar_scaling_inputs(scaling=solar_scaling, year=year):
+    # SOLAR SCALES AND MATCHING CALENDAR FOR "monthly" OR "daily" SCALING
+    if scaling == "monthly":
+        return solar_scales, year_calendar(year)
+    if scaling == "daily":
+        # solar_day_scales has the days of the year set in constants1.py
+        if year == constants1.year:
+            return solar_day_scales, day_calendar(year)
+        return year_day_scales(solar_csv, year), day_calendar(year)
+
+    raise ValueError(f'solar_scaling must be "monthly" or "daily", '
+                     f'not {scaling}')
+
+def assemble_year(template, calendar):
+    # INDEX THE TEMPLATE BY EACH DAY'S (MONTH, DAY TYPE) AND FLATTEN TO STEPS
+    # template: (..., month or day, day type, step of day) -> (..., steps)
+    scale_idx, day_type_idx = calendar
+    year_days = template[..., scale_idx, day_type_idx, :]
+
+    return year_days.reshape(*year_days.shape[:-2], -1)
+
+def ev_year_profile_MW(day_profiles, shares, scales=None, calendar=None,
+                       **template_kwargs):
+    # RESIDENTIAL EV LOAD FOR EVERY HOUR (OR STEP) OF THE YEAR
+    # shares may have leading scenario axes, e.g. (scenario, charge type)
+    # scales defaults to the solar_scaling set in constants1.py; pass
+    # calendar=day_calendar() with one scale per day
+    # Pass steps_per_hour for sub-hourly day_profiles
+    if scales is None:
+        scales, default_calendar = solar_scaling_inputs()
+        calendar = default_calendar if calendar is None else calendar
+    elif calendar is None:
+        calendar = year_calendar(year)
+
+    template = template_tensor(day_profiles, month_share_matrix(shares, scales),
+                               **template_kwargs)
+
+    return assemble_year(template, calendar)
+
+def ev_charge_type_profiles_MW(day_profiles, shares, scales=None,
+                               calendar=None, **template_kwargs):
+    # RESIDENTIAL EV LOAD OF EACH CHARGE TYPE FOR EVERY HOUR (OR STEP)
+    # As ev_year_profile_MW() with a charge type axis before the steps,
+    # (..., charge type, steps), which sums to ev_year_profile_MW()
+    if scales is None:
+        scales, default_calendar = solar_scaling_inputs()
+        calendar = default_calendar if calendar is None else calendar
+    elif calendar is None:
+        calendar = year_calendar(year)
+
+    # One set of shares per charge type, with every other charge type zeroed
+    # after the solar scaling
+    month_shares = month_share_matrix(shares, scales)
+    n_types = month_shares.shape[-1]
+    type_shares = month_shares[..., np.newaxis, :, :] * \
+                  np.eye(n_types)[:, np.newaxis, :]
+
+    template = template_tensor(day_profiles, type_shares, **template_kwargs)
+
+    return assemble_year(template, calendar)
+
+def year_profile_MW():
+    # COMBINE RES EV LOAD PROFILE WITH TOTAL QLD LOAD PROFILE
+    ev_loads = ev_year_profile_MW(day_profile_array(), charge_type_shares())
+    qld_loads = pd.read_csv(total_qld_loads)['Load (MW)'].to_numpy()
+
+    year_profile_df = pd.DataFrame({'Load (MW)': ev_loads + qld_loads})
+
+    # Export year dataframe to csv file
+    year_profile_df.to_csv(export_csv, index=False)
+
+
+if __name__ == "__main__":
+    year_profile_MW()
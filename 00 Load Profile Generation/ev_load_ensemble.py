@@ -0,0 +1,248 @@
+'''
+Monte Carlo ensemble of annual loads for uncertain EV inputs.
+
+The charge type shares, solar_scales and vehicle_sizes_GWh in constants1.py
+are point estimates. Each ensemble member draws a perturbed set of these
+inputs from the distributions in ensemble_distributions (seeded, so runs are
+repeatable), and the members' annual loads are computed in batches by
+ev_load_engine.py as (member x hour) arrays.
+
+Members are processed in chunks and folded into running summaries, so large
+ensembles (e.g. 10,000 members) never need to be held in memory at once:
+ - per hour: mean, standard deviation, min, max and percentiles (percentiles
+   are read from a fixed-bin histogram of each hour),
+ - per member: peak load, hour of the peak, minimum load and annual energy,
+   which are kept in full so their percentiles are exact.
+The full (member x hour) array can also be written to a .npy file on disk.
+'''
+
+from constants1 import *
+import ev_load_engine as engine
+import numpy as np
+import pandas as pd
+
+ensemble_npz = f"{todays_date}_{year}_ensemble_{percent_flex}_flex.npz"
+
+# ALTER: distribution of each uncertain input
+# "dirichlet" (shares only): concentration around the point estimate, higher
+#     is tighter
+# "normal": point estimate x (1 + sd * z)
+# "lognormal": point estimate x exp(sd * z - sd^2 / 2), mean preserving
+# "uniform": point estimate x (1 + U(-width, width))
+# "fixed": point estimate
+ensemble_distributions = {
+    "shares": {"dist": "dirichlet", "concentration": 200},
+    "solar_scales": {"dist": "normal", "sd": 0.05},
+    "vehicle_sizes": {"dist": "lognormal", "sd": 0.1},
+}
+
+summary_percentiles = [5, 25, 50, 75, 95]
+
+def perturb(rng, values, n_members, spec):
+    # DRAW n_members MULTIPLICATIVE PERTURBATIONS OF values
+    # Returns array of shape (member, value)
+    values = np.asarray(values, dtype=float)
+    shape = (n_members, len(values))
+
+    if spec["dist"] == "fixed":
+        return np.broadcast_to(values, shape).copy()
+    if spec["dist"] == "normal":
+        return values * (1 + spec["sd"] * rng.standard_normal(shape))
+    if spec["dist"] == "lognormal":
+        sd = spec["sd"]
+        return values * np.exp(sd * rng.standard_normal(shape) - sd**2 / 2)
+    if spec["dist"] == "uniform":
+        return values * (1 + rng.uniform(-spec["width"], spec["width"], shape))
+
+    raise ValueError(f"Unknown distribution {spec['dist']}")
+
+def sample_shares(rng, shares, n_members, spec):
+    # CHARGE TYPE SHARES FOR EACH MEMBER, STILL SUMMING TO THE POINT ESTIMATE
+    shares = np.asarray(shares, dtype=float)
+
+    if spec["dist"] == "dirichlet":
+        # Charge types with no share stay at zero
+        sampled = np.zeros((n_members, len(shares)))
+        positive = shares > 0
+        sampled[:, positive] = rng.dirichlet(
+            spec["concentration"] * shares[positive] / shares.sum(), n_members)
+        return sampled * shares.sum()
+
+    if spec["dist"] == "fixed":
+        return perturb(rng, shares, n_members, spec)
+
+    sampled = np.clip(perturb(rng, shares, n_members, spec), 0, None)
+    return sampled * shares.sum() / sampled.sum(axis=1, keepdims=True)
+
+def sample_inputs(n_members, seed=0, distributions=ensemble_distributions,
+                  shares=None, scales=None,
+                  sizes_GWh=list(vehicle_sizes_GWh.values())):
+    # DRAW EVERY MEMBER'S INPUTS UP FRONT
+    # Inputs are a few numbers per member, so the ensemble is the same
+    # whatever chunk size it is later computed with
+    # Returns shares (member, charge type), scales (member, month) and
+    # sizes_GWh (member, size)
+    if shares is None:
+        shares = engine.charge_type_shares()
+    if scales is None:
+        scales, _ = engine.solar_scaling_inputs()
+    rng = np.random.default_rng(seed)
+
+    member_shares = sample_shares(rng, shares, n_members,
+                                  distributions["shares"])
+    member_scales = perturb(rng, scales, n_members,
+                            distributions["solar_scales"])
+    member_sizes = np.clip(perturb(rng, sizes_GWh, n_members,
+                                   distributions["vehicle_sizes"]), 0, None)
+
+    # Scaled coordinated charging share can't go above 100%
+    coord_share = member_shares[:, -1:]
+    max_scales = np.divide(1, coord_share, out=np.full_like(coord_share, np.inf),
+                           where=coord_share > 0)
+    member_scales = np.clip(member_scales, 0, max_scales)
+
+    return member_shares, member_scales, member_sizes
+
+def ensemble_chunks(inputs, day_profiles=None, qld_loads_csv=total_qld_loads,
+                    chunk_size=500):
+    # YIELD THE ANNUAL LOADS (MW) OF chunk_size MEMBERS AT A TIME
+    # Each chunk is an array of shape (member, hour)
+    if day_profiles is None:
+        day_profiles = engine.day_profile_array()
+    member_shares, member_scales, member_sizes = inputs
+
+    # Monthly or daily solar scales (solar_scaling in constants1.py)
+    if member_scales.shape[-1] == 12:
+        calendar = engine.year_calendar(year)
+    else:
+        calendar = engine.day_calendar(year)
+
+    qld_loads = 0
+    if qld_loads_csv is not None:
+        qld_loads = pd.read_csv(qld_loads_csv)['Load (MW)'].to_numpy()
+
+    for start in range(0, len(member_shares), chunk_size):
+        chunk = slice(start, start + chunk_size)
+        ev_loads = engine.ev_year_profile_MW(day_profiles, member_shares[chunk],
+                                             member_scales[chunk], calendar,
+                                             sizes_GWh=member_sizes[chunk])
+        yield ev_loads + qld_loads
+
+def ensemble_loads(inputs, **chunk_kwargs):
+    # EVERY MEMBER'S LOADS AS ONE (member x hour) ARRAY, for small ensembles
+    return np.concatenate(list(ensemble_chunks(inputs, **chunk_kwargs)))
+
+def hour_bins(first_chunk, n_bins):
+    # HISTOGRAM RANGE OF EACH HOUR, FROM THE FIRST CHUNK WITH HALF ITS SPREAD
+    # AGAIN ON EACH SIDE. Later values outside the range fall in the end bins
+    low = first_chunk.min(axis=0)
+    high = first_chunk.max(axis=0)
+    padding = (high - low) / 2 + 1 # MW
+
+    return low - padding, high + padding
+
+def summarise_ensemble(chunks, n_bins=1000, percentiles=summary_percentiles,
+                       out_npy=None, n_members=None):
+    # FOLD CHUNKS OF (member x hour) LOADS INTO RUNNING SUMMARIES
+    # Pass out_npy and n_members to also write every member to a .npy file
+    count = 0
+    member_stats = {'peak_MW': [], 'peak_hour': [], 'min_MW': [],
+                    'energy_GWh': []}
+    members_out = None
+
+    for chunk in chunks:
+        n_chunk, n_hours = chunk.shape
+
+        if count == 0:
+            mean = np.zeros(n_hours)
+            m2 = np.zeros(n_hours) # Sum of squared differences from the mean
+            hour_min = np.full(n_hours, np.inf)
+            hour_max = np.full(n_hours, -np.inf)
+            low, high = hour_bins(chunk, n_bins)
+            hist = np.zeros(n_hours * n_bins, dtype=np.int64)
+
+            if out_npy is not None:
+                members_out = np.lib.format.open_memmap(
+                    out_npy, mode='w+', dtype=chunk.dtype,
+                    shape=(n_members, n_hours))
+
+        if members_out is not None:
+            members_out[count:count + n_chunk] = chunk
+
+        # MEAN AND VARIANCE: merge each chunk with Chan et al.'s update
+        chunk_mean = chunk.mean(axis=0)
+        chunk_m2 = ((chunk - chunk_mean)**2).sum(axis=0)
+        delta = chunk_mean - mean
+        total = count + n_chunk
+        mean = mean + delta * n_chunk / total
+        m2 = m2 + chunk_m2 + delta**2 * count * n_chunk / total
+        count = total
+
+        hour_min = np.minimum(hour_min, chunk.min(axis=0))
+        hour_max = np.maximum(hour_max, chunk.max(axis=0))
+
+        # PER HOUR HISTOGRAM, counted for all hours at once
+        bin_idx = ((chunk - low) / (high - low) * n_bins).astype(np.int64)
+        bin_idx = np.clip(bin_idx, 0, n_bins - 1) + np.arange(n_hours) * n_bins
+        hist += np.bincount(bin_idx.ravel(), minlength=n_hours * n_bins)
+
+        # PER MEMBER STATISTICS
+        member_stats['peak_MW'].append(chunk.max(axis=1))
+        member_stats['peak_hour'].append(chunk.argmax(axis=1))
+        member_stats['min_MW'].append(chunk.min(axis=1))
+        member_stats['energy_GWh'].append(chunk.sum(axis=1) / 1000)
+
+    if members_out is not None:
+        members_out.flush()
+
+    summary = {'n_members': count, 'mean': mean, 'std': np.sqrt(m2 / count),
+               'min': hour_min, 'max': hour_max,
+               'percentiles': np.asarray(percentiles, dtype=float),
+               'hour_percentiles': histogram_percentiles(
+                   hist.reshape(-1, n_bins), low, high, percentiles,
+                   hour_min, hour_max)}
+    for stat, values in member_stats.items():
+        summary[stat] = np.concatenate(values)
+
+    return summary
+
+def histogram_percentiles(hist, low, high, percentiles, hour_min, hour_max):
+    # PERCENTILES OF EACH HOUR FROM ITS HISTOGRAM
+    # Linear within each bin, and limited to the exact min and max of the hour
+    # Returns array of shape (percentile, hour)
+    n_hours, n_bins = hist.shape
+    cumulative = np.cumsum(hist, axis=1)
+    bin_width = (high - low) / n_bins
+    hours = np.arange(n_hours)
+
+    hour_percentiles = np.empty((len(percentiles), n_hours))
+    for i, percentile in enumerate(percentiles):
+        target = percentile / 100 * cumulative[:, -1]
+        bin_idx = (cumulative < target[:, np.newaxis]).sum(axis=1)
+        bin_idx = np.minimum(bin_idx, n_bins - 1)
+
+        below = np.where(bin_idx > 0, cumulative[hours, bin_idx - 1], 0)
+        in_bin = np.maximum(hist[hours, bin_idx], 1)
+        fraction = np.clip((target - below) / in_bin, 0, 1)
+
+        hour_percentiles[i] = low + (bin_idx + fraction) * bin_width
+
+    return np.clip(hour_percentiles, hour_min, hour_max)
+
+def member_percentiles(summary, percentiles=summary_percentiles):
+    # EXACT PERCENTILES OF EACH PER MEMBER STATISTIC
+    return pd.DataFrame({stat: np.percentile(summary[stat], percentiles)
+                         for stat in ['peak_MW', 'min_MW', 'energy_GWh']},
+                        index=pd.Index(percentiles, name='percentile'))
+
+def save_summary(summary, filename=ensemble_npz):
+    np.savez(filename, **summary)
+
+
+if __name__ == "__main__":
+    n_members = 10000
+    inputs = sample_inputs(n_members, seed=0)
+    summary = summarise_ensemble(ensemble_chunks(inputs))
+
+    save_summary(summary)
+    print(member_percentiles(summary))
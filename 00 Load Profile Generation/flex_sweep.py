@@ -0,0 +1,98 @@
+'''
+Continuous sweep over the percentage of coordinated (flexible) charging.
+
+percentages_csv only has a few discrete flex columns. The share of each other
+charge type varies linearly with the coordinated charging share across those
+columns, so shares for any flex fraction are interpolated between the columns
+(and linearly extrapolated outside them). The annual load for every flex
+fraction is computed in one pass by ev_load_engine.py and saved as a single
+(flex x hour) matrix in a .npz file.
+
+At high flex fractions the solar scaled coordinated charging share of the
+sunniest months would go above 100% (and the other shares below zero), so the
+solar scales of each flex fraction are capped at 1 / flex fraction, as
+ev_load_ensemble.py does for its members.
+'''
+
+from constants1 import *
+import ev_load_engine as engine
+import numpy as np
+import pandas as pd
+
+sweep_npz = f"{todays_date}_{year}_flex_sweep.npz"
+
+def interpolated_shares(flex_fractions, percentages_csv=percentages_csv):
+    # CHARGE TYPE SHARES FOR ANY FLEX FRACTION (0-1)
+    # Returns array of shape (flex fraction, charge type), coordinated last
+    _, table = engine.charge_type_share_table(percentages_csv)
+    if len(table) < 2:
+        raise ValueError(f"{percentages_csv} has {len(table)} flex column, "
+                         f"at least two are needed to interpolate between")
+
+    # The coordinated charging share of each column is its flex fraction
+    table = table[np.argsort(table[:, -1])]
+    table_flex = table[:, -1]
+    flex_fractions = np.asarray(flex_fractions, dtype=float)
+
+    shares = np.empty((len(flex_fractions), table.shape[1]))
+    shares[:, -1] = flex_fractions
+
+    for i in range(table.shape[1] - 1):
+        shares[:, i] = np.interp(flex_fractions, table_flex, table[:, i])
+
+        # Extend the first and last segments beyond the table's columns
+        below = flex_fractions < table_flex[0]
+        above = flex_fractions > table_flex[-1]
+        low_slope = ((table[1, i] - table[0, i]) /
+                     (table_flex[1] - table_flex[0]))
+        high_slope = ((table[-1, i] - table[-2, i]) /
+                      (table_flex[-1] - table_flex[-2]))
+        shares[below, i] = (table[0, i] + low_slope *
+                            (flex_fractions[below] - table_flex[0]))
+        shares[above, i] = (table[-1, i] + high_slope *
+                            (flex_fractions[above] - table_flex[-1]))
+
+    # Shares can't be negative (e.g. rounding error at 100% flex)
+    return np.clip(shares, 0, None)
+
+def feasible_scales(shares, scales):
+    # SOLAR SCALES FOR EACH ROW OF shares, capped so the scaled coordinated
+    # charging share is at most 100%
+    # Returns array of shape (flex fraction, month or day)
+    coord_share = shares[:, -1:]
+    max_scales = np.divide(1, coord_share, out=np.full_like(coord_share, np.inf),
+                           where=coord_share > 0)
+
+    return np.clip(np.asarray(scales, dtype=float)[np.newaxis], 0, max_scales)
+
+def flex_sweep(flex_fractions=np.arange(0, 100.5, 0.5) / 100,
+               sweep_weekday_csv=weekday_csv, sweep_weekend_csv=weekend_csv,
+               percentages_csv=percentages_csv, qld_loads_csv=total_qld_loads):
+    # ANNUAL LOAD (MW) FOR EVERY FLEX FRACTION
+    # Returns array of shape (flex fraction, hour)
+    day_profiles = engine.day_profile_array(sweep_weekday_csv, sweep_weekend_csv)
+    shares = interpolated_shares(flex_fractions, percentages_csv)
+    scales, calendar = engine.solar_scaling_inputs()
+
+    ev_loads = engine.ev_year_profile_MW(day_profiles, shares,
+                                         feasible_scales(shares, scales),
+                                         calendar)
+
+    if qld_loads_csv is None:
+        return ev_loads
+
+    return ev_loads + pd.read_csv(qld_loads_csv)['Load (MW)'].to_numpy()
+
+def save_sweep(flex_fractions, loads, filename=sweep_npz, dtype=np.float64):
+    # Uncompressed so the file is quick to write and read back
+    np.savez(filename, flex=np.asarray(flex_fractions),
+             loads=np.asarray(loads, dtype=dtype))
+
+def load_sweep(filename=sweep_npz):
+    with np.load(filename) as sweep:
+        return sweep['flex'], sweep['loads']
+
+
+if __name__ == "__main__":
+    flex_fractions = np.arange(0, 100.5, 0.5) / 100
+    save_sweep(flex_fractions, flex_sweep(flex_fractions))
@@ -0,0 +1,106 @@
+'''
+Write complete GenX Load_data.csv files straight into GenX case folders.
+
+The demand segment and time domain columns (Voll, Demand_Segment, ...,
+Sub_Weights) are copied from an existing Load_data.csv template, followed by
+Time_Index and one Load_MW_z<zone> column per zone. Rows are streamed to the
+file with the csv module rather than building a DataFrame, and several cases
+can be written at once with a process pool.
+
+Running this script writes the Load_data.csv for every batch scenario (see
+batch_scenarios.py) into its existing case folder,
+genx_cases_folder/<profile folder>/<date>_<flex>_flex (a new folder dated
+todays_date for a scenario without a case).
+'''
+
+from constants1 import *
+from batch_scenarios import flex_label, scenario_loads
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import glob
+import csv
+import os
+
+def load_data_metadata(template_csv=load_data_template):
+    # READ THE HEADER AND DEMAND SEGMENT ROWS FROM A TEMPLATE Load_data.csv
+    with open(template_csv, newline='') as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        n_meta = header.index('Time_Index')
+
+        metadata_rows = []
+        for row in reader:
+            if not any(row[:n_meta]):
+                break
+            metadata_rows.append(row[:n_meta])
+
+    return header[:n_meta], metadata_rows
+
+def write_load_data(case_folder, loads, template_csv=load_data_template,
+                    float_format='%.10g'):
+    # STREAM A COMPLETE Load_data.csv INTO case_folder
+    # loads: MW of shape (hour,) for one zone or (hour, zone)
+    loads = np.asarray(loads, dtype=float)
+    if loads.ndim == 1:
+        loads = loads[:, np.newaxis]
+    n_hours, n_zones = loads.shape
+
+    meta_header, metadata_rows = load_data_metadata(template_csv)
+
+    # A single representative period covers every timestep of the series
+    if metadata_rows[0][meta_header.index('Rep_Periods')] == '1':
+        metadata_rows[0][meta_header.index('Timesteps_per_Rep_Period')] = \
+            str(n_hours)
+
+    blank_row = [''] * len(meta_header)
+    load_cols = [f'Load_MW_z{zone + 1}' for zone in range(n_zones)]
+
+    os.makedirs(case_folder, exist_ok=True)
+    load_data_csv = os.path.join(case_folder, 'Load_data.csv')
+
+    # csv.writer uses \r\n line endings, the same as the existing cases
+    with open(load_data_csv, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(meta_header + ['Time_Index'] + load_cols)
+
+        for hour in range(n_hours):
+            meta = metadata_rows[hour] if hour < len(metadata_rows) else blank_row
+            writer.writerow(meta + [hour + 1] +
+                            [float_format % load for load in loads[hour]])
+
+    return load_data_csv
+
+def case_folder_name(profile, flex_col):
+    # CASE FOLDER OF A SCENARIO, e.g. ../01 GenX Cases/01 Day Peak/230515_50_flex
+    # The existing <date>_<flex>_flex case of the profile (the latest date if
+    # there are several), or a new one dated todays_date
+    profile_folder = os.path.join(genx_cases_folder,
+                                  profile_case_folders[profile])
+    existing = sorted(glob.glob(os.path.join(
+        profile_folder, f"*_{flex_label(flex_col)}_flex")))
+    existing = [folder for folder in existing if os.path.isdir(folder)]
+    if existing:
+        return existing[-1]
+
+    return os.path.join(profile_folder,
+                        f"{todays_date}_{flex_label(flex_col)}_flex")
+
+def write_cases(case_folders, loads, template_csv=load_data_template,
+                processes=1):
+    # WRITE Load_data.csv FOR MANY CASES, OPTIONALLY IN PARALLEL
+    if processes > 1:
+        with ProcessPoolExecutor(processes) as pool:
+            futures = [pool.submit(write_load_data, case_folder, case_loads,
+                                   template_csv)
+                       for case_folder, case_loads in zip(case_folders, loads)]
+            return [future.result() for future in futures]
+
+    return [write_load_data(case_folder, case_loads, template_csv)
+            for case_folder, case_loads in zip(case_folders, loads)]
+
+
+if __name__ == "__main__":
+    scenarios, loads = scenario_loads()
+    case_folders = [case_folder_name(profile, flex_col)
+                    for profile, flex_col in scenarios]
+    write_cases(case_folders, loads, processes=os.cpu_count())
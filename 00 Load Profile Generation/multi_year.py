@@ -0,0 +1,177 @@
+'''
+Generate the load profiles for several target years in one run.
+
+target_years_csv lists each target year with its total QLD consumption (GWh)
+and the residential EV energy (GWh) of each vehicle size. For every year:
+ - the 2022 AEMO demand is mapped onto the target year's calendar by date
+   (29 February reuses 28 February) and scaled up to the year's consumption,
+ - the CSIRO assumed residential EV loads for that year are subtracted, as
+   qld_loads_gen.py does with assumed_res_ev_loads for 2050,
+ - the residential EV loads for the selected profile and percent_flex are
+   added, as charge_profile_sorting6.py does.
+
+Weekday/weekend counts come from each year's own calendar, so leap years have
+8784 hours. The EV loads for every year are assembled from a single
+(year x month x day type x step of day) template tensor, or
+(year x day x day type x step of day) with solar_scaling = "daily", so the
+coordinated charging share is scaled as in ev_load_engine.py. The CSIRO
+assumed loads keep the monthly scaling they were made with.
+
+resolution_minutes keeps the native 30 minute CSIRO and 5 minute AEMO data
+instead of hourly means, giving 17,520 or 105,120 steps per year (in MW), and
+dtype=np.float32 halves the memory of the assembled series.
+
+Each year is written to its own CSV (year_csv()), named like export_csv with
+a _multi_year suffix so the export of ev_load_engine.py is never overwritten.
+'''
+
+from constants1 import *
+from calcs_for_constants import day_counts
+from qld_loads_gen import folder_path
+from aemo_cache import demand_at_resolution
+import ev_load_engine as engine
+import numpy as np
+import pandas as pd
+
+# Inputs used to make assumed_res_ev_loads in qld_loads_gen.py
+csiro_percentages_csv = "CSIRO_original_percentages.csv"
+csiro_profile_csvs = profile_csvs["Day Peak"]
+
+size_cols = ['small_GWh', 'medium_GWh', 'large_GWh']
+
+def year_day_constants(years):
+    # WEEKDAY/WEEKEND RATIOS AND COUNTS: arrays of shape (year, day type)
+    counts = np.array([day_counts(target_year) for target_year in years],
+                      dtype=float)
+    weekday_ratios = counts[:, 0] / (counts[:, 0] + counts[:, 1])
+    ratios = np.stack([weekday_ratios, 1 - weekday_ratios], axis=1)
+
+    return ratios, counts
+
+def year_solar_inputs(years, scaling=solar_scaling):
+    # SOLAR SCALES (year, month or day) AND THE CALENDAR OF EVERY TARGET YEAR
+    # Daily scales are padded to the longest year with their last day, which
+    # the calendars of shorter years never index
+    inputs = [engine.solar_scaling_inputs(scaling, target_year)
+              for target_year in years]
+    n_scales = max(len(scales) for scales, _ in inputs)
+    scales = np.array([np.pad(np.asarray(scales, dtype=float),
+                              (0, n_scales - len(scales)), mode='edge')
+                       for scales, _ in inputs])
+
+    return scales, [calendar for _, calendar in inputs]
+
+def multi_year_calendar(calendars):
+    # YEAR, SCALE (MONTH OR DAY) AND DAY TYPE INDEX OF EVERY DAY OF EVERY
+    # TARGET YEAR, from the calendar of each year
+    year_idx = np.concatenate([np.full(len(scale_idx), i) for i, (scale_idx, _)
+                               in enumerate(calendars)])
+    scale_idx = np.concatenate([scale_idx for scale_idx, _ in calendars])
+    day_type_idx = np.concatenate([day_type_idx for _, day_type_idx
+                                   in calendars])
+
+    return year_idx, scale_idx, day_type_idx
+
+def year_steps(years, resolution_minutes=60):
+    # EVERY STEP OF EVERY TARGET YEAR AS datetime64[m], WITH ITS YEAR INDEX
+    steps = [np.arange(f'{target_year}-01-01', f'{target_year + 1}-01-01',
+                       np.timedelta64(resolution_minutes, 'm'),
+                       dtype='datetime64[m]') for target_year in years]
+    step_year_idx = np.concatenate([np.full(len(target_steps), i)
+                                    for i, target_steps in enumerate(steps)])
+
+    return np.concatenate(steps), step_year_idx
+
+def date_time_key(steps):
+    # (month, day, minute of day) AS ONE INTEGER, WITH 29 FEBRUARY AS 28 FEBRUARY
+    month = steps.astype('datetime64[M]').astype(int) % 12
+    day = (steps.astype('datetime64[D]') -
+           steps.astype('datetime64[M]')).astype(int)
+    minute = (steps.astype('datetime64[m]') -
+              steps.astype('datetime64[D]')).astype(int)
+
+    day = np.where((month == 1) & (day == 28), 27, day)
+
+    return (month * 31 + day) * 1440 + minute
+
+def ev_loads_by_year(day_profiles, shares, years, sizes_GWh,
+                     resolution_minutes=60, dtype=np.float64,
+                     scaling=solar_scaling):
+    # RESIDENTIAL EV LOADS (MW) FOR ALL TARGET YEARS, CONCATENATED
+    # sizes_GWh: (year, size), scaling: "monthly" or "daily" solar scaling
+    ratios, counts = year_day_constants(years)
+    scales, calendars = year_solar_inputs(years, scaling)
+    steps_per_hour = engine.STEPS_PER_HOUR[resolution_minutes]
+    template = engine.template_tensor(
+        day_profiles, engine.month_share_matrix(shares, scales), sizes_GWh,
+        ratios, counts, steps_per_hour=steps_per_hour)
+
+    year_idx, scale_idx, day_type_idx = multi_year_calendar(calendars)
+
+    return template.astype(dtype)[year_idx, scale_idx, day_type_idx, :].ravel()
+
+def multi_year_loads(target_years_df, profile_weekday_csv=weekday_csv,
+                     profile_weekend_csv=weekend_csv,
+                     percentages_csv=percentages_csv,
+                     percent_flex=percent_flex, resolution_minutes=60,
+                     dtype=np.float64):
+    # TOTAL QLD LOADS (MW) FOR EVERY TARGET YEAR
+    # Returns {year: array of loads for every resolution_minutes step}
+    years = target_years_df['year'].to_numpy()
+    sizes_GWh = target_years_df[size_cols].to_numpy(dtype=float)
+    steps, step_year_idx = year_steps(years, resolution_minutes)
+    steps_per_hour = engine.STEPS_PER_HOUR[resolution_minutes]
+
+    # SCALE THE BASE YEAR DEMAND UP TO EACH YEAR'S CONSUMPTION
+    base_df = demand_at_resolution(folder_path, resolution_minutes)
+    consumption_base = (base_df['TOTALDEMAND'] / 1000).sum() / \
+                       steps_per_hour # GWh
+    scales = (target_years_df['consumption_GWh'].to_numpy(dtype=float) /
+              consumption_base)
+
+    base_keys = date_time_key(base_df.index.to_numpy().astype('datetime64[m]'))
+    key_order = np.argsort(base_keys)
+    base_idx = key_order[np.searchsorted(base_keys[key_order],
+                                         date_time_key(steps))]
+    scaled_loads = (base_df['TOTALDEMAND'].to_numpy()[base_idx] *
+                    scales[step_year_idx]).astype(dtype)
+
+    # Subtract EV loads (CSIRO assumed loads)
+    csiro_loads = ev_loads_by_year(
+        engine.day_profile_array(*csiro_profile_csvs,
+                                 resolution_minutes=resolution_minutes),
+        engine.charge_type_shares(csiro_percentages_csv, 'CSIRO'),
+        years, sizes_GWh, resolution_minutes, dtype, scaling="monthly")
+    no_res_ev_loads = scaled_loads - csiro_loads
+
+    # COMBINE RES EV LOAD PROFILE WITH TOTAL QLD LOAD PROFILE
+    ev_loads = ev_loads_by_year(
+        engine.day_profile_array(profile_weekday_csv, profile_weekend_csv,
+                                 resolution_minutes),
+        engine.charge_type_shares(percentages_csv, percent_flex),
+        years, sizes_GWh, resolution_minutes, dtype)
+    loads = no_res_ev_loads + ev_loads
+
+    return {target_year: loads[step_year_idx == i]
+            for i, target_year in enumerate(years)}
+
+def year_csv(target_year, resolution_minutes=60):
+    # CSV OF ONE TARGET YEAR: export_csv's name with a _multi_year suffix (and
+    # the resolution if not hourly), so it never replaces export_csv
+    resolution_label = "" if resolution_minutes == 60 else \
+                       f"_{resolution_minutes}min"
+
+    return (f"{todays_date}_{target_year}_loads_{percent_flex}_flex"
+            f"_multi_year{resolution_label}.csv")
+
+def export_years(year_loads, resolution_minutes=60):
+    # One CSV per year
+    for target_year, loads in year_loads.items():
+        pd.DataFrame({'Load (MW)': loads}).to_csv(
+            year_csv(target_year, resolution_minutes), index=False)
+
+
+if __name__ == "__main__":
+    export_years(multi_year_loads(pd.read_csv(target_years_csv),
+                                  resolution_minutes=resolution_minutes),
+                 resolution_minutes)
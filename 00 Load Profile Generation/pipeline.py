@@ -0,0 +1,296 @@
+'''
+Incremental runner for the load profile generation steps.
+
+Each stage in stages is a script (or a function call) with the files it
+reads, the files or folders it writes and the stages it must run after. A
+stage's input hash covers its input files, the command and the code of the
+script and every local module it imports (constants1.py included), so a
+stage is re-run only when one of these changes or its outputs are missing or
+were edited by hand. Stages are run level by level in dependency order, with
+independent stale stages run in parallel as separate processes.
+
+The outputs of every run are kept in cache_folder keyed by the input hash,
+so going back to an earlier set of inputs (e.g. undoing a change to a
+percentage column) restores the earlier outputs instead of recomputing them.
+
+Running this script brings every stage up to date. Stage names can be given
+as arguments to only bring those stages (and the stages they depend on) up
+to date, e.g. python pipeline.py ev_loads
+'''
+
+from constants1 import *
+from genx_load_writer import case_folder_name
+from multi_year import year_csv
+from concurrent.futures import ThreadPoolExecutor
+import ev_load_engine as engine
+import pandas as pd
+import subprocess
+import hashlib
+import shutil
+import glob
+import json
+import sys
+import os
+import re
+
+pipeline_folder = os.path.dirname(os.path.abspath(__file__))
+state_json = ".pipeline_state.json"
+cache_folder = ".pipeline_cache"
+
+def python_call(module, function, *args):
+    # COMMAND RUNNING module.function(*args) IN A NEW PROCESS
+    return [sys.executable, "-c",
+            f"import {module}; {module}.{function}(*{args!r})"]
+
+def genx_load_data_csvs():
+    # Load_data.csv OF EVERY CASE WRITTEN BY genx_load_writer.py
+    flex_cols, _ = engine.charge_type_share_table(percentages_csv)
+
+    return [os.path.join(case_folder_name(profile, flex_col), "Load_data.csv")
+            for profile in profile_csvs for flex_col in flex_cols]
+
+def multi_year_csvs():
+    # CSV OF EVERY TARGET YEAR WRITTEN BY multi_year.py
+    years = pd.read_csv(target_years_csv)['year']
+
+    return [year_csv(target_year, resolution_minutes) for target_year in years]
+
+profile_inputs = [csv_name for pair in profile_csvs.values()
+                  for csv_name in pair]
+
+# STAGES: command, inputs, outputs and the stages they run after
+stages = {
+    "qld_loads": {
+        "command": [sys.executable, "qld_loads_gen.py"],
+        "inputs": ["2022 Loads/*.csv", "2050_res_EV_loads_CSIRO1.csv"],
+        "outputs": [total_qld_loads],
+        "after": [],
+    },
+    "constants": {
+        "command": python_call("calcs_for_constants", "derived_constants",
+                               solar_csv, year, "constants_cache.json"),
+        "inputs": [solar_csv],
+        "outputs": ["constants_cache.json"],
+        "after": [],
+    },
+    "ev_loads": {
+        "command": [sys.executable, "ev_load_engine.py"],
+        "inputs": [weekday_csv, weekend_csv, percentages_csv, total_qld_loads,
+                   solar_csv],
+        "outputs": [export_csv],
+        "after": ["qld_loads", "constants"],
+    },
+    "batch": {
+        "command": [sys.executable, "batch_scenarios.py"],
+        "inputs": profile_inputs + [percentages_csv, total_qld_loads, solar_csv],
+        "outputs": [batch_output_folder],
+        "after": ["qld_loads", "constants"],
+    },
+    "flex_sweep": {
+        "command": [sys.executable, "flex_sweep.py"],
+        "inputs": [weekday_csv, weekend_csv, percentages_csv, total_qld_loads,
+                   solar_csv],
+        "outputs": [f"{todays_date}_{year}_flex_sweep.npz"],
+        "after": ["qld_loads", "constants"],
+    },
+    "genx_load_data": {
+        "command": [sys.executable, "genx_load_writer.py"],
+        "inputs": profile_inputs + [percentages_csv, total_qld_loads, solar_csv,
+                                    load_data_template],
+        "outputs": genx_load_data_csvs(),
+        "after": ["qld_loads", "constants"],
+    },
+    "multi_year": {
+        "command": [sys.executable, "multi_year.py"],
+        "inputs": ["2022 Loads/*.csv", target_years_csv,
+                   "CSIRO_original_percentages.csv", weekday_csv, weekend_csv,
+                   percentages_csv] + profile_inputs,
+        "outputs": multi_year_csvs(),
+        "after": ["constants"],
+    },
+}
+
+def file_hash(path):
+    # HASH OF A FILE, OR OF EVERY FILE IN A FOLDER (None IF MISSING)
+    if os.path.isdir(path):
+        digest = hashlib.sha256()
+        for root, dirs, files in sorted(os.walk(path)):
+            dirs.sort()
+            for filename in sorted(files):
+                filepath = os.path.join(root, filename)
+                digest.update(os.path.relpath(filepath, path).encode())
+                digest.update(file_hash(filepath).encode())
+        return digest.hexdigest()
+
+    if not os.path.exists(path):
+        return None
+
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def local_modules(script, found=None):
+    # script AND EVERY MODULE IN THIS FOLDER IT IMPORTS, RECURSIVELY
+    if found is None:
+        found = set()
+    found.add(script)
+
+    with open(script) as f:
+        source = f.read()
+    for module in re.findall(r'^\s*(?:from|import)\s+(\w+)', source, re.M):
+        module_py = f"{module}.py"
+        if module_py not in found and os.path.exists(module_py):
+            local_modules(module_py, found)
+
+    return found
+
+def stage_code(stage):
+    # LOCAL CODE FILES A STAGE RUNS
+    command = stage["command"]
+    if command[1] == "-c":
+        module = re.match(r'import (\w+)', command[2]).group(1)
+        return local_modules(f"{module}.py")
+
+    return local_modules(command[1])
+
+def expand_inputs(patterns):
+    files = []
+    for pattern in patterns:
+        files.extend(sorted(glob.glob(pattern)) if '*' in pattern else [pattern])
+
+    return files
+
+def input_hash(stage):
+    # ONE HASH OF A STAGE'S COMMAND, CODE AND INPUT FILES
+    digest = hashlib.sha256(json.dumps(stage["command"][1:]).encode())
+    for path in sorted(stage_code(stage)) + expand_inputs(stage["inputs"]):
+        digest.update(path.encode())
+        digest.update(str(file_hash(path)).encode())
+
+    return digest.hexdigest()
+
+def check_outputs():
+    # EVERY OUTPUT IS WRITTEN BY ONE STAGE: stages run in parallel and their
+    # cached outputs are restored, so two writers would overwrite each other
+    writers = {}
+    for name, stage in stages.items():
+        for output in stage["outputs"]:
+            path = os.path.normpath(output)
+            if path in writers:
+                raise ValueError(f"Stages {writers[path]} and {name} both "
+                                 f"write {output}")
+            writers[path] = name
+
+def stage_levels(targets=None):
+    # STAGES GROUPED INTO LEVELS: each level only depends on earlier levels
+    check_outputs()
+
+    needed = set()
+    def add_stage(name):
+        if name not in needed:
+            needed.add(name)
+            for dependency in stages[name]["after"]:
+                add_stage(dependency)
+    for name in (targets or stages):
+        add_stage(name)
+
+    levels = []
+    done = set()
+    while len(done) < len(needed):
+        level = [name for name in stages if name in needed - done
+                 and set(stages[name]["after"]) <= done]
+        if not level:
+            raise ValueError("Stage dependencies form a cycle")
+        levels.append(level)
+        done.update(level)
+
+    return levels
+
+def cache_outputs(name, stage_hash, outputs):
+    # COPY A STAGE'S OUTPUTS INTO cache_folder/<stage>/<input hash>/
+    entry_folder = os.path.join(cache_folder, name, stage_hash)
+    shutil.rmtree(entry_folder, ignore_errors=True)
+    os.makedirs(entry_folder)
+
+    for i, output in enumerate(outputs):
+        if os.path.isdir(output):
+            shutil.copytree(output, os.path.join(entry_folder, str(i)))
+        elif os.path.exists(output):
+            shutil.copy2(output, os.path.join(entry_folder, str(i)))
+
+def restore_outputs(name, stage_hash, outputs):
+    # COPY CACHED OUTPUTS BACK, returns False if they aren't cached
+    entry_folder = os.path.join(cache_folder, name, stage_hash)
+    cached = [os.path.join(entry_folder, str(i)) for i in range(len(outputs))]
+    if not all(os.path.exists(path) for path in cached):
+        return False
+
+    for path, output in zip(cached, outputs):
+        if os.path.isdir(output):
+            shutil.rmtree(output)
+        if os.path.isdir(path):
+            shutil.copytree(path, output)
+        else:
+            os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+            shutil.copy2(path, output)
+
+    return True
+
+def run_stage(name):
+    result = subprocess.run(stages[name]["command"], capture_output=True,
+                            text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"Stage {name} failed:\n{result.stderr}")
+
+def run_pipeline(targets=None, workers=os.cpu_count(), force=False):
+    # BRING THE TARGET STAGES (DEFAULT ALL) UP TO DATE
+    # Returns {stage: "up to date", "restored" or "ran"}
+    os.chdir(pipeline_folder)
+
+    state = {}
+    if os.path.exists(state_json):
+        with open(state_json) as f:
+            state = json.load(f)
+
+    status = {}
+    for level in stage_levels(targets):
+        # Input hashes are taken after the previous level, so a changed
+        # upstream output makes the stages that read it stale
+        hashes = {name: input_hash(stages[name]) for name in level}
+        stale = []
+
+        for name in level:
+            outputs = stages[name]["outputs"]
+            output_hashes = {output: file_hash(output) for output in outputs}
+            recorded = state.get(name, {})
+
+            if not force and recorded.get("input_hash") == hashes[name] \
+               and recorded.get("output_hashes") == output_hashes \
+               and None not in output_hashes.values():
+                status[name] = "up to date"
+            elif not force and restore_outputs(name, hashes[name], outputs):
+                status[name] = "restored"
+            else:
+                stale.append(name)
+
+        with ThreadPoolExecutor(max(1, min(workers, len(stale) or 1))) as pool:
+            for name, _ in zip(stale, pool.map(run_stage, stale)):
+                cache_outputs(name, hashes[name], stages[name]["outputs"])
+                status[name] = "ran"
+
+        for name in level:
+            state[name] = {"input_hash": hashes[name],
+                           "output_hashes": {output: file_hash(output) for
+                                             output in stages[name]["outputs"]}}
+
+        with open(state_json, 'w') as f:
+            json.dump(state, f, indent=4)
+
+    return status
+
+
+if __name__ == "__main__":
+    for name, stage_status in run_pipeline(sys.argv[1:] or None).items():
+        print(f"{name}: {stage_status}")
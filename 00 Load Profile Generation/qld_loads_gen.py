@@ -1,47 +1,39 @@
 '''
 Generate the overall load profile for Queensland for the year 2050.
 Start by generating the profile for 2022, then scale up.
+
+The monthly AEMO CSV files are read through aemo_cache.py, which only parses
+files that are new or have changed since the last run. total_qld_loads is
+only rewritten when the loads differ from it by more than tolerance_MW, so
+float noise never changes the committed file or the stages that read it.
 '''
-import os
 import pandas as pd
+import numpy as np
+import os
+from aemo_cache import hourly_demand
+from constants1 import total_qld_loads
 
-folder_path = 'C:/Users/Gabriella Vidgen/OneDrive/UNI/Subjects/METR4912/00 Modelling/00 Input Generation/02 Load Profile Generation/2022 Loads'
+# folder_path = 'C:/Users/Gabriella Vidgen/OneDrive/UNI/Subjects/METR4912/00 Modelling/00 Input Generation/02 Load Profile Generation/2022 Loads'
+folder_path = '2022 Loads'
 assumed_res_ev_loads = "2050_res_EV_loads_CSIRO1.csv" # KEEP CONSTANT BETWEEN SCENARIOS!!
 
 consumption_2050 = 109955.026 # GWh
+tolerance_MW = 1e-6 # largest change to total_qld_loads that isn't written
+
+def same_loads(df, filename):
+    # True if filename HOLDS THE LOADS OF df TO WITHIN tolerance_MW
+    if not os.path.exists(filename):
+        return False
+    existing = pd.read_csv(filename)
+
+    return list(existing.columns) == list(df.columns) and \
+           existing.shape == df.shape and \
+           np.allclose(existing.to_numpy(), df.to_numpy(), rtol=0,
+                       atol=tolerance_MW)
 
-def pre_process(filename): # input: folder_dir
-    # Remove redundant columns
-    df = pd.read_csv(filename) # Demand data is in MW for each 5 min interval
-    df = df.drop(['REGION', 'RRP', 'PERIODTYPE'], axis=1)
-    
-    # Get python to recognise that the 1st column is time data
-    df['SETTLEMENTDATE'] = pd.to_datetime(df['SETTLEMENTDATE'], format='%Y/%m/%d %H:%M:%S')
-    df.set_index('SETTLEMENTDATE', inplace=True)
-
-    # Resample the data to hourly intervals and calculate the mean of each hour
-    df = df.resample("1H").mean() 
-
-    # Remove the last row (next month's data)
-    df = df.drop(df.index[-1])
-    return df
-    
 def get_year():
-    # Create an empty list to store the DataFrames
-    dataframes = []
-
-    # Iterate through each file in the directory
-    for filename in os.listdir(folder_path):
-        # Check if the file is a CSV file
-        if filename.endswith(".csv"):
-            # Read the CSV file into a DataFrame
-            filepath = os.path.join(folder_path, filename)
-            df = pre_process(filepath)
-            # Append the DataFrame to the list
-            dataframes.append(df)
-
-    # Concatenate all the DataFrames into a single DataFrame
-    year_df = pd.concat(dataframes, ignore_index=True)
+    # Hourly demand for every month in the folder, ordered by timestamp
+    year_df = hourly_demand(folder_path).reset_index(drop=True)
 
     # Scale up 2022 data to get 2050 profile
     consumption_2022 = (year_df/1000).sum() # GWh
@@ -55,7 +47,10 @@ def get_year():
     res_EV_loads = pd.read_csv(assumed_res_ev_loads)
     no_res_EV_year_df = scaled_year_df - res_EV_loads
 
-    no_res_EV_year_df.to_csv('QLD_loads_2050_no_res_EVs2.csv', index=None) # ALTER
+    # Written to the non-EV load file the EV load scripts read (constants1.py)
+    if not same_loads(no_res_EV_year_df, total_qld_loads):
+        no_res_EV_year_df.to_csv(total_qld_loads, index=None,
+                                 lineterminator='\r\n')
 
 if __name__ == '__main__':
     get_year()
\ No newline at end of file
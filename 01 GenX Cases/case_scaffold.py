@@ -0,0 +1,142 @@
+'''
+Scaffold GenX case folders from a template case.
+
+Every case folder is identical except for Load_data.csv, so the shared input
+files of the template case (Generators_data.csv, Generators_variability.csv,
+Fuels_data.csv, Network.csv, Run.jl, Settings/, ...) are hard-linked into each
+new case instead of copied, and only Load_data.csv is written per case (by
+genx_load_writer.py in the load profile generation folder). The outputs of a
+run (Results/, TDR_Results/ and run_log.txt, see run_cases.py) and hidden
+folders such as caches are never shared. Symbolic links,
+then plain copies, are used where hard links can't be made (e.g. across
+drives).
+
+Linked files share one copy on disk: editing a shared file in place changes
+it for every case made from the template. To change a single case, replace
+its file (delete it and write a new one) rather than editing it in place.
+
+Existing case folders are never changed unless overwrite=True is passed:
+their files would be replaced by links to the template's.
+
+Running this script scaffolds a case for every batch scenario (see
+batch_scenarios.py) that doesn't have a case folder yet, named as
+genx_load_writer.case_folder_name(). Existing cases are skipped.
+'''
+
+import shutil
+import sys
+import os
+
+genx_cases_folder = os.path.dirname(os.path.abspath(__file__))
+load_generation_folder = os.path.join(os.path.dirname(genx_cases_folder),
+                                      "00 Load Profile Generation")
+sys.path.insert(0, load_generation_folder)
+
+from genx_load_writer import write_cases
+from run_cases import case_outputs
+
+template_case = os.path.join(genx_cases_folder, "01 Day Peak", "230515_30_flex")
+
+# Case specific inputs, never shared between cases (nor are case_outputs)
+case_files = ["Load_data.csv"]
+
+def shared_files(template_folder=template_case):
+    # RELATIVE PATHS OF EVERY FILE SHARED BETWEEN CASES
+    files = []
+    for root, dirs, filenames in os.walk(template_folder):
+        dirs[:] = sorted(folder for folder in dirs if not folder.startswith('.')
+                         and (root != template_folder
+                              or folder not in case_outputs))
+        for filename in sorted(filenames):
+            path = os.path.relpath(os.path.join(root, filename), template_folder)
+            if path not in case_files + case_outputs:
+                files.append(path)
+
+    return files
+
+def link_file(source, destination, link="hardlink"):
+    # LINK (OR COPY) source TO destination, returns the method used
+    if os.path.lexists(destination):
+        if os.path.exists(destination) and os.path.samefile(source, destination):
+            return "existing"
+        os.remove(destination)
+
+    methods = {"hardlink": ["hardlink", "symlink", "copy"],
+               "symlink": ["symlink", "copy"], "copy": ["copy"]}[link]
+
+    for method in methods:
+        try:
+            if method == "hardlink":
+                os.link(source, destination)
+            elif method == "symlink":
+                os.symlink(os.path.relpath(source, os.path.dirname(destination)),
+                           destination)
+            else:
+                shutil.copy2(source, destination)
+            return method
+        except OSError:
+            if method == "copy":
+                raise
+
+def scaffold_case(case_folder, template_folder=template_case, link="hardlink",
+                  files=None, overwrite=False):
+    # CREATE case_folder WITH THE TEMPLATE'S SHARED FILES LINKED IN
+    # Returns {relative path: link method}
+    # An existing case_folder is only changed with overwrite=True
+    if os.path.exists(case_folder) and not overwrite:
+        raise FileExistsError(f"{case_folder} already exists, pass "
+                              f"overwrite=True to replace its shared files")
+    if files is None:
+        files = shared_files(template_folder)
+
+    methods = {}
+    for path in files:
+        destination = os.path.join(case_folder, path)
+        os.makedirs(os.path.dirname(destination), exist_ok=True)
+        methods[path] = link_file(os.path.join(template_folder, path),
+                                  destination, link)
+
+    return methods
+
+def scaffold_cases(case_folders, loads, template_folder=template_case,
+                   link="hardlink", processes=1, overwrite=False):
+    # SCAFFOLD EVERY CASE AND WRITE ITS Load_data.csv
+    # loads: one array of hourly MW (or (hour, zone)) per case
+    # Nothing is written if any case folder exists, unless overwrite=True
+    existing = [folder for folder in case_folders if os.path.exists(folder)]
+    if existing and not overwrite:
+        raise FileExistsError(f"Case folders already exist: {existing}, pass "
+                              f"overwrite=True to replace their shared files")
+
+    files = shared_files(template_folder)
+    for case_folder in case_folders:
+        scaffold_case(case_folder, template_folder, link, files, overwrite)
+
+    return write_cases(case_folders, loads,
+                       os.path.join(template_folder, "Load_data.csv"),
+                       processes)
+
+
+if __name__ == "__main__":
+    # Scenario inputs are relative to the load profile generation folder
+    os.chdir(load_generation_folder)
+
+    from genx_load_writer import case_folder_name
+    from batch_scenarios import scenario_loads
+
+    scenarios, loads = scenario_loads()
+    case_folders = [case_folder_name(profile, flex_col)
+                    for profile, flex_col in scenarios]
+
+    # Only scenarios without a case are scaffolded
+    new_cases = [(case_folder, case_loads)
+                 for case_folder, case_loads in zip(case_folders, loads)
+                 if not os.path.exists(case_folder)]
+    for case_folder in case_folders:
+        if os.path.exists(case_folder):
+            print(f"{case_folder}: exists, skipped")
+
+    if new_cases:
+        new_folders, new_loads = zip(*new_cases)
+        scaffold_cases(list(new_folders), list(new_loads),
+                       processes=os.cpu_count())
@@ -0,0 +1,179 @@
+'''
+Run many GenX cases in parallel.
+
+Case folders (folders with a Load_data.csv under the profile folders) are
+run with run_command, a list of arguments run inside each case folder where
+"{threads}" and "{case}" are replaced by the job's thread budget and the case
+folder. The default runs Run.jl with Julia; any other command (e.g. a stand
+in script that writes fake Results/ files) can be passed instead.
+
+workers cases are run at once, each with a budget of threads threads (also
+set as JULIA_NUM_THREADS and OMP_NUM_THREADS). The status of every case
+(queued, running, done or failed) is saved to state_json after every change,
+so an interrupted run can be started again and only the cases that didn't
+finish are run. A case is skipped when its inputs and Results/ are unchanged
+since it last finished (cases run before this script existed are skipped when
+their Results/ are newer than their inputs). TDR_Results is an input when
+time_domain_reduction.py wrote it, and an output when GenX clustered the case
+itself during the run.
+
+Set OverwriteResults: 1 in Settings/genx_settings.yml so GenX writes to
+Results/ rather than a new Results_<n> folder.
+'''
+
+from time_domain_reduction import (case_folders, genx_cases_folder,
+                                   error_report_csv)
+from concurrent.futures import ThreadPoolExecutor
+import subprocess
+import threading
+import datetime
+import hashlib
+import json
+import os
+
+state_json = os.path.join(genx_cases_folder, ".run_state.json")
+run_command = ["julia", "--threads", "{threads}", "Run.jl"]
+results_folder = "Results"
+tdr_folder = "TDR_Results"
+log_filename = "run_log.txt"
+
+# Not inputs of a case (TDR_Results is unless GenX wrote it, see input_files())
+case_outputs = [results_folder, tdr_folder, log_filename]
+
+def folder_files(folder, skip=()):
+    # EVERY FILE IN folder (RELATIVE PATHS), apart from the top level skip
+    # Hidden folders (caches such as .results_cache) are not inputs
+    files = []
+    for root, dirs, filenames in os.walk(folder):
+        dirs[:] = sorted(name for name in dirs if not name.startswith('.')
+                         and (root != folder or name not in skip))
+        files.extend(os.path.relpath(os.path.join(root, filename), folder)
+                     for filename in sorted(filenames)
+                     if root != folder or filename not in skip)
+
+    return files
+
+def files_hash(folder, files):
+    digest = hashlib.sha256()
+    for path in files:
+        digest.update(path.encode())
+        with open(os.path.join(folder, path), 'rb') as f:
+            digest.update(hashlib.sha256(f.read()).digest())
+
+    return digest.hexdigest()
+
+def input_files(case_folder):
+    # EVERY INPUT FILE OF A CASE (RELATIVE PATHS)
+    # TDR_Results written by time_domain_reduction.py (it has an error report)
+    # is read by the run, so it is an input
+    files = folder_files(case_folder, case_outputs)
+    tdr_path = os.path.join(case_folder, tdr_folder)
+    if os.path.exists(os.path.join(tdr_path, error_report_csv)):
+        files += [os.path.join(tdr_folder, path)
+                  for path in folder_files(tdr_path)]
+
+    return files
+
+def input_hash(case_folder):
+    return files_hash(case_folder, input_files(case_folder))
+
+def results_hash(case_folder):
+    # None IF THE CASE HAS NO RESULTS
+    folder = os.path.join(case_folder, results_folder)
+    files = folder_files(folder) if os.path.isdir(folder) else []
+
+    return files_hash(folder, files) if files else None
+
+def results_newer_than_inputs(case_folder):
+    # FOR CASES WITH NO STATE: Results/ WRITTEN AFTER EVERY INPUT FILE
+    folder = os.path.join(case_folder, results_folder)
+    if results_hash(case_folder) is None:
+        return False
+
+    newest_input = max(os.path.getmtime(os.path.join(case_folder, path))
+                       for path in input_files(case_folder))
+    oldest_result = min(os.path.getmtime(os.path.join(folder, path))
+                        for path in folder_files(folder))
+
+    return oldest_result >= newest_input
+
+def up_to_date(case_folder, record):
+    if record is None:
+        return results_newer_than_inputs(case_folder)
+
+    return (record.get("status") == "done"
+            and record.get("input_hash") == input_hash(case_folder)
+            and record.get("results_hash") == results_hash(case_folder))
+
+def case_key(case_folder):
+    return os.path.relpath(case_folder, genx_cases_folder)
+
+def load_state():
+    if os.path.exists(state_json):
+        with open(state_json) as f:
+            return json.load(f)
+    return {}
+
+def run_case(case_folder, command, threads):
+    # RUN ONE CASE, LOGGING ITS OUTPUT TO run_log.txt
+    args = [arg.format(threads=threads, case=case_folder) for arg in command]
+    env = dict(os.environ, JULIA_NUM_THREADS=str(threads),
+               OMP_NUM_THREADS=str(threads))
+
+    with open(os.path.join(case_folder, log_filename), 'w') as log:
+        result = subprocess.run(args, cwd=case_folder, env=env, stdout=log,
+                                stderr=subprocess.STDOUT)
+
+    return result.returncode
+
+def run_cases(cases=None, command=run_command, workers=None, threads=1,
+              force=False):
+    # RUN EVERY CASE THAT ISN'T UP TO DATE, workers AT A TIME
+    # Returns {case: status}
+    if cases is None:
+        cases = case_folders()
+    if workers is None:
+        workers = max(1, (os.cpu_count() or 1) // threads)
+
+    state = load_state()
+    lock = threading.Lock()
+
+    def set_status(case_folder, **record):
+        with lock:
+            state.setdefault(case_key(case_folder), {}).update(record)
+            with open(state_json, 'w') as f:
+                json.dump(state, f, indent=4)
+
+    # QUEUE: cases that are stale, failed or were interrupted while running
+    queued = [case_folder for case_folder in cases
+              if force or not up_to_date(case_folder,
+                                         state.get(case_key(case_folder)))]
+    for case_folder in queued:
+        set_status(case_folder, status="queued")
+
+    def job(case_folder):
+        case_input_hash = input_hash(case_folder)
+        set_status(case_folder, status="running",
+                   started=datetime.datetime.now().isoformat(timespec='seconds'))
+
+        try:
+            returncode = run_case(case_folder, command, threads)
+        except OSError as error: # e.g. command not found
+            returncode = str(error)
+
+        set_status(case_folder,
+                   status="done" if returncode == 0 else "failed",
+                   returncode=returncode, input_hash=case_input_hash,
+                   results_hash=results_hash(case_folder),
+                   finished=datetime.datetime.now().isoformat(timespec='seconds'))
+
+    with ThreadPoolExecutor(workers) as pool:
+        list(pool.map(job, queued))
+
+    return {case_key(case_folder): state[case_key(case_folder)]["status"]
+            if case_folder in queued else "up to date" for case_folder in cases}
+
+
+if __name__ == "__main__":
+    for case, status in run_cases().items():
+        print(f"{case}: {status}")
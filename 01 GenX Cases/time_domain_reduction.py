@@ -0,0 +1,397 @@
+'''
+Representative period clustering for the GenX cases.
+
+Every case runs the full 8760 hour year. This script clusters the weeks of a
+case's Load_data.csv and Generators_variability.csv together and writes
+reduced inputs to the case's TimeDomainReductionFolder (TDR_Results), where
+Run.jl picks them up instead of clustering again:
+ - Load_data.csv with Rep_Periods, Timesteps_per_Rep_Period and one
+   Sub_Weights entry per representative period (weights sum to WeightTotal),
+ - Generators_variability.csv and Fuels_data.csv for the representative
+   periods only,
+ - Period_map.csv mapping every week of the year to its representative week,
+ - TDR_error_report.csv comparing the represented year with the full year.
+
+The clustering follows Settings/time_domain_reduction_settings.yml
+(TimestepsPerRepPeriod, ClusterMethod, ScalingMethod, MinPeriods,
+MaxPeriods, IterativelyAddPeriods, Threshold, nReps, LoadWeight,
+WeightTotal, UseExtremePeriods and ExtremePeriods). All restarts of k-means
+or k-medoids are run together as arrays. Representative periods are actual
+weeks of the year (the closest week to each k-means centre), so loads and
+capacity factors stay physically consistent.
+
+To use the reduced inputs set TimeDomainReduction: 1 and OperationWrapping: 1
+in Settings/genx_settings.yml.
+'''
+
+import numpy as np
+import yaml
+import csv
+import os
+
+genx_cases_folder = os.path.dirname(os.path.abspath(__file__))
+case_profile_folders = ["01 Day Peak", "02 Day and Night Peaks"]
+# Written by this script only (not by GenX's own clustering)
+error_report_csv = "TDR_error_report.csv"
+
+def read_csv_rows(filename):
+    # HEADER AND ROWS AS STRINGS, so values are written back unchanged
+    # Returns header, rows and whether the file starts with a byte order mark
+    with open(filename, newline='', encoding='utf-8-sig') as f:
+        rows = list(csv.reader(f))
+    with open(filename, 'rb') as f:
+        has_bom = f.read(3) == b'\xef\xbb\xbf'
+
+    return rows[0], rows[1:], has_bom
+
+def write_csv_rows(filename, header, rows, has_bom=False):
+    encoding = 'utf-8-sig' if has_bom else 'utf-8'
+    with open(filename, 'w', newline='', encoding=encoding) as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        writer.writerows(rows)
+
+def read_settings(case_folder):
+    # TIME DOMAIN REDUCTION AND GENX SETTINGS OF A CASE
+    settings_folder = os.path.join(case_folder, "Settings")
+    with open(os.path.join(settings_folder,
+                           "time_domain_reduction_settings.yml")) as f:
+        tdr_settings = yaml.safe_load(f)
+    with open(os.path.join(settings_folder, "genx_settings.yml")) as f:
+        genx_settings = yaml.safe_load(f)
+
+    return tdr_settings, genx_settings
+
+def case_series(case_folder):
+    # HOURLY LOADS AND CAPACITY FACTORS OF A CASE
+    # Returns the load and variability column names and (hour, column) arrays
+    load_header, load_rows, _ = read_csv_rows(
+        os.path.join(case_folder, "Load_data.csv"))
+    var_header, var_rows, _ = read_csv_rows(
+        os.path.join(case_folder, "Generators_variability.csv"))
+
+    load_cols = [col for col in load_header if col.startswith("Load_MW_z")]
+    load_idx = [load_header.index(col) for col in load_cols]
+    loads = np.array([[float(row[i]) for i in load_idx] for row in load_rows])
+
+    var_cols = var_header[1:] # First column is Time_Index
+    var = np.array([[float(value) for value in row[1:]] for row in var_rows])
+
+    return load_cols, loads, var_cols, var
+
+def scale_columns(series, method="S"):
+    # STANDARDISE ("S") OR NORMALISE ("N") EACH COLUMN OVER THE WHOLE YEAR
+    # Constant columns (e.g. thermal capacity factors of 1) become zero
+    if method == "S":
+        centre = series.mean(axis=0)
+        spread = series.std(axis=0)
+    else:
+        centre = series.min(axis=0)
+        spread = series.max(axis=0) - centre
+
+    return np.divide(series - centre, spread, out=np.zeros_like(series),
+                     where=spread > 0)
+
+def period_features(series, period_length):
+    # SPLIT (hour, column) SERIES INTO PERIODS
+    # Hours after the last full period are dropped, as GenX does
+    # Returns array of shape (period, column * hour of period)
+    n_periods = len(series) // period_length
+    periods = series[:n_periods * period_length].reshape(
+        n_periods, period_length, -1)
+
+    return periods.transpose(0, 2, 1).reshape(n_periods, -1)
+
+def squared_distances(points, centres):
+    # SQUARED EUCLIDEAN DISTANCE OF EVERY POINT TO EVERY CENTRE
+    # points: (n, feature), centres: (..., k, feature) -> (..., n, k)
+    return np.maximum((points**2).sum(axis=1)[:, np.newaxis] -
+                      2 * points @ np.swapaxes(centres, -1, -2) +
+                      (centres**2).sum(axis=-1)[..., np.newaxis, :], 0)
+
+def kmeans(points, k, n_reps=100, max_iter=300, seed=0):
+    # k-means WITH k-means++ STARTS, ALL n_reps RESTARTS RUN AS ONE ARRAY
+    # Returns the labels and representative periods of the lowest inertia restart
+    rng = np.random.default_rng(seed)
+    n_points = len(points)
+
+    # K-MEANS++ STARTING CENTRES
+    centres = np.empty((n_reps, k, points.shape[1]))
+    centres[:, 0] = points[rng.integers(n_points, size=n_reps)]
+    nearest = squared_distances(points, centres[:, :1])[..., 0]
+    for j in range(1, k):
+        probs = nearest / np.maximum(nearest.sum(axis=1, keepdims=True), 1e-300)
+        choice = (rng.random((n_reps, 1)) > probs.cumsum(axis=1)).sum(axis=1)
+        centres[:, j] = points[np.minimum(choice, n_points - 1)]
+        nearest = np.minimum(nearest,
+                             squared_distances(points, centres[:, j:j+1])[..., 0])
+
+    # LLOYD ITERATIONS
+    for _ in range(max_iter):
+        labels = squared_distances(points, centres).argmin(axis=2)
+        members = (labels[..., np.newaxis] == np.arange(k)).astype(float)
+        counts = members.sum(axis=1)[..., np.newaxis]
+
+        # Empty clusters keep their previous centre
+        sums = np.einsum('rnk,nf->rkf', members, points)
+        new_centres = np.where(counts > 0, sums / np.maximum(counts, 1),
+                               centres)
+
+        if np.allclose(new_centres, centres):
+            break
+        centres = new_centres
+
+    distances = squared_distances(points, centres)
+    labels = distances.argmin(axis=2)
+    inertia = distances.min(axis=2).sum(axis=1)
+    best = inertia.argmin()
+
+    # Representative period: the member closest to each centre
+    medoids = np.array([np.where(labels[best] == j, distances[best, :, j],
+                                 np.inf).argmin() for j in range(k)])
+
+    return labels[best], medoids
+
+def kmedoids(points, k, n_reps=100, max_iter=300, seed=0):
+    # k-medoids (ALTERNATING), ALL n_reps RESTARTS RUN AS ONE ARRAY
+    # Returns the labels and medoid periods of the lowest cost restart
+    rng = np.random.default_rng(seed)
+    n_points = len(points)
+    pair_distances = np.sqrt(squared_distances(points, points))
+
+    medoids = np.argsort(rng.random((n_reps, n_points)), axis=1)[:, :k]
+
+    for _ in range(max_iter):
+        labels = pair_distances[:, medoids].transpose(1, 0, 2).argmin(axis=2)
+        members = labels[..., np.newaxis] == np.arange(k) # (rep, point, k)
+
+        # Cost of each point as the medoid of each cluster (members only)
+        costs = np.einsum('cn,rnk->rkc', pair_distances, members.astype(float))
+        costs = np.where(members.transpose(0, 2, 1), costs, np.inf)
+        new_medoids = np.where(np.isfinite(costs.min(axis=2)),
+                               costs.argmin(axis=2), medoids)
+
+        if np.array_equal(new_medoids, medoids):
+            break
+        medoids = new_medoids
+
+    medoid_distances = pair_distances[:, medoids].transpose(1, 0, 2)
+    labels = medoid_distances.argmin(axis=2)
+    cost = medoid_distances.min(axis=2).sum(axis=1)
+    best = cost.argmin()
+
+    return labels[best], medoids[best]
+
+def profile_columns(profile, load_cols, var_cols):
+    # COLUMNS OF A "Load", "PV" OR "Wind" EXTREME PERIOD PROFILE
+    if profile == "Load":
+        return "load", list(range(len(load_cols)))
+
+    keywords = {"PV": ("solar", "pv"), "Wind": ("wind",)}[profile]
+    return "var", [i for i, col in enumerate(var_cols)
+                   if any(keyword in col.lower() for keyword in keywords)]
+
+def extreme_periods(settings, loads, var, load_cols, var_cols, period_length):
+    # PERIODS SELECTED BY ExtremePeriods, e.g. the week with the highest hour
+    # of system load or the lowest total wind output
+    if not settings.get("UseExtremePeriods"):
+        return []
+
+    series = {"load": loads, "var": var}
+    extremes = []
+    for profile, geographies in settings.get("ExtremePeriods", {}).items():
+        kind, cols = profile_columns(profile, load_cols, var_cols)
+        if not cols:
+            continue
+        n_periods = len(series[kind]) // period_length
+        periods = series[kind][:n_periods * period_length, cols].reshape(
+            n_periods, period_length, len(cols))
+
+        for geography, types in geographies.items():
+            # Zone: each column separately, System: the sum of the columns
+            if geography == "System":
+                geo_periods = periods.sum(axis=2, keepdims=True)
+            else:
+                geo_periods = periods
+
+            for extreme_type, directions in types.items():
+                if extreme_type == "Absolute":
+                    stats = {"Max": geo_periods.max(axis=1),
+                             "Min": geo_periods.min(axis=1)}
+                else: # Integral
+                    totals = geo_periods.sum(axis=1)
+                    stats = {"Max": totals, "Min": totals}
+
+                for direction, selected in directions.items():
+                    if not selected:
+                        continue
+                    stat = stats[direction]
+                    chosen = stat.argmax(axis=0) if direction == "Max" \
+                             else stat.argmin(axis=0)
+                    extremes.extend(int(period) for period in chosen)
+
+    # Keep the order found, without repeats
+    return list(dict.fromkeys(extremes))
+
+def cluster_periods(features, settings, extremes, seed=0):
+    # CLUSTER THE NON-EXTREME PERIODS, ADDING CLUSTERS UNTIL Threshold IS MET
+    # Returns the representative period of every period and the list of
+    # representative periods
+    n_periods = len(features)
+    others = np.array([period for period in range(n_periods)
+                       if period not in extremes])
+    cluster = kmedoids if settings.get("ClusterMethod") == "kmedoids" \
+              else kmeans
+
+    min_k = max(settings.get("MinPeriods", 8) - len(extremes), 1)
+    max_k = max(settings.get("MaxPeriods", 11) - len(extremes), min_k)
+    if not settings.get("IterativelyAddPeriods"):
+        max_k = min_k
+    max_k = min(max_k, len(others))
+    min_k = min(min_k, max_k)
+
+    # Threshold is a fraction of the largest distance between two periods
+    largest = np.sqrt(squared_distances(features, features).max())
+
+    for k in range(min_k, max_k + 1):
+        labels, medoids = cluster(features[others], k,
+                                  settings.get("nReps", 100), seed=seed)
+        rep_of = np.arange(n_periods)
+        rep_of[others] = others[medoids[labels]]
+
+        errors = np.sqrt(((features - features[rep_of])**2).sum(axis=1))
+        if errors.max() <= settings.get("Threshold", 0.05) * largest:
+            break
+
+    reps = sorted(set(extremes) | set(int(period) for period in others[medoids]))
+
+    return rep_of, reps
+
+def period_weights(rep_of, reps, period_length, weight_total):
+    # HOURS REPRESENTED BY EACH REPRESENTATIVE PERIOD, SCALED TO weight_total
+    counts = np.array([(rep_of == rep).sum() for rep in reps], dtype=float)
+    weights = counts * period_length
+
+    return weights * weight_total / weights.sum()
+
+def error_report(load_cols, loads, var_cols, var, rep_of, reps, weights,
+                 period_length):
+    # COMPARE THE REPRESENTED YEAR WITH THE FULL YEAR FOR EVERY VARYING COLUMN
+    n_hours = len(rep_of) * period_length
+    hour_rep = (rep_of[:, np.newaxis] * period_length +
+                np.arange(period_length)).ravel()
+    rep_hours = (np.array(reps)[:, np.newaxis] * period_length +
+                 np.arange(period_length))
+    hour_weights = np.repeat(weights / period_length, period_length)
+
+    rows = []
+    for cols, series in [(load_cols, loads), (var_cols, var)]:
+        for i, col in enumerate(cols):
+            full = series[:, i]
+            if np.ptp(full) == 0:
+                continue
+            represented = full[hour_rep]
+            full_year = full[:n_hours]
+
+            # Annual total from the weighted representative periods
+            weighted_total = (full[rep_hours.ravel()] * hour_weights).sum()
+            rows.append([col, np.sqrt(np.mean((represented - full_year)**2)),
+                         np.mean(np.abs(represented - full_year)),
+                         full.sum(), weighted_total,
+                         (weighted_total - full.sum()) / full.sum() * 100,
+                         full.max(), full[rep_hours.ravel()].max(),
+                         np.sqrt(np.mean((np.sort(represented) -
+                                          np.sort(full_year))**2))])
+
+    header = ["Column", "RMSE", "MAE", "Full_Year_Total",
+              "Represented_Total", "Total_Error_%", "Full_Year_Peak",
+              "Represented_Peak", "Duration_Curve_RMSE"]
+
+    return header, rows
+
+def reduce_case(case_folder, seed=0):
+    # CLUSTER ONE CASE AND WRITE ITS TimeDomainReductionFolder
+    tdr_settings, genx_settings = read_settings(case_folder)
+    period_length = tdr_settings.get("TimestepsPerRepPeriod", 168)
+    weight_total = tdr_settings.get("WeightTotal", 8760)
+
+    load_cols, loads, var_cols, var = case_series(case_folder)
+
+    # FEATURES: every column scaled over the year, loads weighted by LoadWeight
+    scaled = np.hstack([scale_columns(loads, tdr_settings.get("ScalingMethod"))
+                        * tdr_settings.get("LoadWeight", 1),
+                        scale_columns(var, tdr_settings.get("ScalingMethod"))])
+    features = period_features(scaled, period_length)
+
+    extremes = extreme_periods(tdr_settings, loads, var, load_cols, var_cols,
+                               period_length)
+    rep_of, reps = cluster_periods(features, tdr_settings, extremes, seed)
+    weights = period_weights(rep_of, reps, period_length, weight_total)
+
+    rep_hours = (np.array(reps)[:, np.newaxis] * period_length +
+                 np.arange(period_length)).ravel()
+
+    tdr_folder = os.path.join(case_folder, genx_settings.get(
+        "TimeDomainReductionFolder", "TDR_Results"))
+    os.makedirs(tdr_folder, exist_ok=True)
+
+    # LOAD DATA: demand segment columns kept, time domain columns updated
+    header, rows, bom = read_csv_rows(os.path.join(case_folder, "Load_data.csv"))
+    time_col = header.index("Time_Index")
+    reduced_rows = []
+    for i, hour in enumerate(rep_hours):
+        row = [''] * time_col + [str(i + 1)] + rows[hour][time_col + 1:]
+        if i < len(rows) and any(rows[i][:time_col]):
+            row[:time_col] = rows[i][:time_col]
+        if i < len(reps):
+            row[header.index("Sub_Weights")] = f"{weights[i]:.10g}"
+        reduced_rows.append(row)
+    reduced_rows[0][header.index("Rep_Periods")] = str(len(reps))
+    reduced_rows[0][header.index("Timesteps_per_Rep_Period")] = str(period_length)
+    write_csv_rows(os.path.join(tdr_folder, "Load_data.csv"), header,
+                   reduced_rows, bom)
+
+    # GENERATORS VARIABILITY
+    header, rows, bom = read_csv_rows(
+        os.path.join(case_folder, "Generators_variability.csv"))
+    write_csv_rows(os.path.join(tdr_folder, "Generators_variability.csv"),
+                   header, [[str(i + 1)] + rows[hour][1:]
+                            for i, hour in enumerate(rep_hours)], bom)
+
+    # FUELS DATA: the first row (Time_Index 0) holds CO2 content
+    header, rows, bom = read_csv_rows(os.path.join(case_folder, "Fuels_data.csv"))
+    write_csv_rows(os.path.join(tdr_folder, "Fuels_data.csv"), header,
+                   [rows[0]] + [[str(i + 1)] + rows[hour + 1][1:]
+                                for i, hour in enumerate(rep_hours)], bom)
+
+    # PERIOD MAP: every period's representative period (1-based, as GenX)
+    write_csv_rows(os.path.join(tdr_folder, "Period_map.csv"),
+                   ["Period_Index", "Rep_Period", "Rep_Period_Index"],
+                   [[period + 1, rep + 1, reps.index(rep) + 1]
+                    for period, rep in enumerate(rep_of)])
+
+    report_header, report_rows = error_report(load_cols, loads, var_cols, var,
+                                              rep_of, reps, weights,
+                                              period_length)
+    write_csv_rows(os.path.join(tdr_folder, error_report_csv),
+                   report_header, [[row[0]] + [f"{value:.6g}" for value in row[1:]]
+                                   for row in report_rows])
+
+    return tdr_folder
+
+def case_folders(cases_folder=genx_cases_folder):
+    # EVERY CASE FOLDER (folders with a Load_data.csv) UNDER THE PROFILE FOLDERS
+    folders = []
+    for profile_folder in case_profile_folders:
+        profile_path = os.path.join(cases_folder, profile_folder)
+        for case in sorted(os.listdir(profile_path)):
+            case_path = os.path.join(profile_path, case)
+            if os.path.exists(os.path.join(case_path, "Load_data.csv")):
+                folders.append(case_path)
+
+    return folders
+
+
+if __name__ == "__main__":
+    for case_folder in case_folders():
+        print(reduce_case(case_folder))
@@ -0,0 +1,183 @@
+'''
+Calendar of the modelled year for slicing the hourly results.
+
+GenX numbers the hours of the year t1, t2, ... (the index of hourly() and
+load_by_zone() in results_store.py). calendar() gives every hour its timestamp
+in model_year along with its month, day of the year, hour of the day, day type
+(weekday or weekend) and southern hemisphere season. It is built once per
+year and shared, so any result indexed by hour can be sliced by date, month,
+season or day type without counting offsets, e.g.
+
+    power = hourly('Results1/30/', 'power')
+    power.loc[day_hours('2050-04-05')]
+    power.loc[select_hours(season='Winter', day_type='weekend')]
+    timestamped(power).loc['2050-07']
+
+day_matrix() reshapes hourly values (with any leading scenario axes, e.g. a
+scenario_cube.py array) into (..., day, hour of day), so days are picked from
+all the days of the year in one array operation: extreme_day() finds the day
+with the highest (or lowest) daily peak or total, e.g. of net load,
+curtailment or non-served energy, and typical_day() the day whose profile is
+closest to the mean profile of a season and day type.
+'''
+
+import pandas as pd
+import numpy as np
+
+model_year = 2050
+hours_per_day = 24
+
+month_labels = ['J', 'F', 'M', 'A', 'M', 'J', 'J', 'A', 'S', 'O', 'N', 'D']
+season_names = ['Summer', 'Autumn', 'Winter', 'Spring']
+# Season of each month (1-12), southern hemisphere
+month_seasons = {12: 'Summer', 1: 'Summer', 2: 'Summer',
+                 3: 'Autumn', 4: 'Autumn', 5: 'Autumn',
+                 6: 'Winter', 7: 'Winter', 8: 'Winter',
+                 9: 'Spring', 10: 'Spring', 11: 'Spring'}
+# Day of each season in the seasonal figures: the 5th of January, April, July
+# and October (all weekdays in 2050)
+season_dates = {'Summer': '2050-01-05', 'Autumn': '2050-04-05',
+                'Winter': '2050-07-05', 'Spring': '2050-10-05'}
+
+# Built calendars: {(year, hours): DataFrame}
+_calendars = {}
+
+def calendar(year=model_year, n_hours=8760):
+    # TIMESTAMP, MONTH, DAY, HOUR OF DAY, DAY TYPE AND SEASON OF EVERY HOUR
+    # Indexed by the GenX hour (1 to n_hours)
+    key = (year, n_hours)
+    if key not in _calendars:
+        times = pd.date_range(f'{year}-01-01', periods=n_hours, freq='h')
+        df = pd.DataFrame({'time': times,
+                           'month': times.month,
+                           'day': times.dayofyear,
+                           'hour_of_day': times.hour,
+                           'weekday': times.dayofweek, # Monday = 0
+                           'day_type': np.where(times.dayofweek >= 5,
+                                                'weekend', 'weekday'),
+                           'season': times.month.map(month_seasons)},
+                          index=pd.RangeIndex(1, n_hours + 1, name='Hour'))
+        _calendars[key] = df
+
+    return _calendars[key].copy()
+
+def timestamped(values, year=model_year):
+    # values (INDEXED BY HOUR) WITH THE TIMESTAMPS AS INDEX
+    # e.g. timestamped(df).loc['2050-04'] or .resample('D').sum()
+    values = values.copy()
+    values.index = pd.DatetimeIndex(
+        calendar(year).loc[values.index, 'time'], name='time')
+
+    return values
+
+def day_of_year(day, year=model_year):
+    # DAY OF THE YEAR (1-365) OF A DATE ('2050-04-05'), or a day of the year
+    if isinstance(day, (int, np.integer)):
+        return int(day)
+    date = pd.Timestamp(day)
+    if date.year != year:
+        raise ValueError(f"{date.date()} is not in the modelled year {year}")
+
+    return date.dayofyear
+
+def day_date(day, year=model_year):
+    # DATE OF A DAY OF THE YEAR (or a date)
+    return pd.Timestamp(f'{year}-01-01') + pd.Timedelta(
+        days=day_of_year(day, year) - 1)
+
+def day_label(day, year=model_year):
+    # e.g. 'Tuesday 5 April'
+    date = day_date(day, year)
+    return f'{date.day_name()} {date.day} {date.month_name()}'
+
+def day_hours(day, year=model_year):
+    # THE 24 HOURS (t) OF A DAY, given as a date or a day of the year
+    first = (day_of_year(day, year) - 1) * hours_per_day + 1
+    return pd.RangeIndex(first, first + hours_per_day, name='Hour')
+
+def day_window(values, day, year=model_year):
+    # values (INDEXED BY HOUR) OVER day AND THE FIRST HOUR OF THE NEXT DAY,
+    # indexed by the hour of the day (0-24)
+    hours = day_hours(day, year)
+    window = values.loc[hours[0]:hours[-1] + 1]
+    window.index = window.index - hours[0]
+
+    return window
+
+def select_hours(start=None, end=None, month=None, season=None,
+                 day_type=None, year=model_year):
+    # HOURS (t) FROM THE DAY start TO THE DAY end (inclusive) IN THE GIVEN
+    # MONTHS, SEASONS AND DAY TYPE. Each can be one value, a list or None (any)
+    df = calendar(year)
+    selected = np.ones(len(df), dtype=bool)
+    if start is not None:
+        selected &= df['day'].to_numpy() >= day_of_year(start, year)
+    if end is not None:
+        selected &= df['day'].to_numpy() <= day_of_year(end, year)
+    for column, values in [('month', month), ('season', season),
+                           ('day_type', day_type)]:
+        if values is not None:
+            selected &= df[column].isin(np.atleast_1d(values)).to_numpy()
+
+    return df.index[selected]
+
+def select_days(month=None, season=None, day_type=None, year=model_year):
+    # DAYS OF THE YEAR (1-365) IN THE GIVEN MONTHS, SEASONS AND DAY TYPE
+    hours = select_hours(month=month, season=season, day_type=day_type,
+                         year=year)
+    return np.unique(calendar(year).loc[hours, 'day'])
+
+def month_ticks(year=model_year):
+    # FIRST HOUR OF EACH MONTH (counting from 0) AND ITS LABEL, for year plots
+    df = calendar(year)
+    firsts = df.index[(df['time'].dt.day == 1) & (df['hour_of_day'] == 0)]
+
+    return list(firsts - 1), month_labels
+
+def day_matrix(values):
+    # HOURLY VALUES AS (..., day, hour of day)
+    # values: a Series or DataFrame column indexed by hour, or an array with
+    # the hours (from t1) on the last axis
+    values = np.asarray(values, dtype=float)
+    n_days = values.shape[-1] // hours_per_day
+    return values[..., :n_days * hours_per_day].reshape(
+        *values.shape[:-1], n_days, hours_per_day)
+
+def daily(values, stat='max'):
+    # ONE VALUE PER DAY: 'max' (peak hour), 'min' or 'sum' (energy)
+    return getattr(day_matrix(values), stat)(axis=-1)
+
+def extreme_day(values, stat='max', largest=True, month=None, season=None,
+                day_type=None, year=model_year):
+    # DAY OF THE YEAR WITH THE LARGEST (OR SMALLEST) DAILY stat OF values
+    # e.g. extreme_day(net_load) is the day of the highest peak and
+    # extreme_day(curtailment, 'sum') the day with the most energy curtailed.
+    # Leading axes of values give one day each
+    days = select_days(month, season, day_type, year)
+    by_day = daily(values, stat)[..., days - 1]
+    position = by_day.argmax(axis=-1) if largest else by_day.argmin(axis=-1)
+
+    return days[position]
+
+def typical_day(values, month=None, season=None, day_type='weekday',
+                year=model_year):
+    # DAY OF THE YEAR WHOSE PROFILE OF values IS CLOSEST (root mean square) TO
+    # THE MEAN PROFILE OF THE SELECTED DAYS
+    # Leading axes of values give one day each
+    days = select_days(month, season, day_type, year)
+    profiles = day_matrix(values)[..., days - 1, :]
+    mean_profile = profiles.mean(axis=-2, keepdims=True)
+    distance = ((profiles - mean_profile) ** 2).mean(axis=-1)
+
+    return days[distance.argmin(axis=-1)]
+
+def season_days(values, day_type='weekday', year=model_year):
+    # TYPICAL DAY OF EACH SEASON, as {season: day of the year}
+    return {season: typical_day(values, season=season, day_type=day_type,
+                                year=year)
+            for season in season_names}
+
+
+if __name__ == "__main__":
+    print(calendar().groupby(['season', 'day_type'])['day'].nunique())
+    print([day_label(day) for day in [5, 95, 186, 278]])
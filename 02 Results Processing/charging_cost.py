@@ -0,0 +1,121 @@
+'''
+System cost attributable to each EV charging behaviour.
+
+The residential EV load of every scenario is rebuilt from its charge type
+components (convenience, highway fast, vehicle to home, vehicle to grid and
+coordinated charging) with ev_load_engine.py in 00 Load Profile Generation,
+from the same CSIRO profiles and percentages that made the cases'
+Load_data.csv. Each component is priced at the hourly marginal price of the
+zone it is in (prices.csv):
+
+    cost of a charge type = sum over hours of price x charge type load
+
+The rest of Load_data.csv (the load without residential EVs) is priced the
+same way, so the rows of a scenario add up to the cost of its whole load.
+All scenarios are computed at once as (profile, flex %, charge type, hour)
+arrays. charging_costs() gives, per scenario and charge type, the energy, the
+cost, the average price paid and the share of the cost of the whole load.
+Hours where a component is negative (vehicle to home or grid discharging)
+reduce its energy and cost.
+'''
+
+from results_store import split_time_series
+from scenario_cube import scenario_folders, results_folders
+from kpi_engine import scenario_values
+import pandas as pd
+import numpy as np
+import sys
+import os
+
+processing_folder = os.path.dirname(os.path.abspath(__file__))
+load_profile_folder = os.path.join(os.path.dirname(processing_folder),
+                                   '00 Load Profile Generation')
+charging_cost_csv = "charging_costs.csv"
+
+# The load profile scripts are imported from their own folder
+sys.path.insert(0, load_profile_folder)
+from constants1 import profile_csvs, percentages_csv, total_qld_loads
+from batch_scenarios import charge_type_loads, flex_label
+
+ev_zone = 1 # zone of the residential EV load (QLD)
+other_load = "Non-EV load"
+load_tolerance_MW = 1e-3 # largest difference from the non-EV load input
+
+def in_load_profile_folder(filename):
+    return os.path.join(load_profile_folder, filename)
+
+def ev_components(profiles, flex):
+    # EV LOAD OF EACH CHARGE TYPE (MW), as (profile, flex %, charge type, hour)
+    scenarios, charge_types, loads = charge_type_loads(
+        {profile: tuple(in_load_profile_folder(csv) for csv in csvs)
+         for profile, csvs in profile_csvs.items()},
+        in_load_profile_folder(percentages_csv))
+
+    positions = {(profile, int(float(flex_label(flex_col)))): i
+                 for i, (profile, flex_col) in enumerate(scenarios)}
+    missing = [(profile, percent) for profile in profiles for percent in flex
+               if (profile, percent) not in positions]
+    if missing:
+        raise KeyError(f"No EV load profiles for the scenarios {missing}")
+
+    index = [[positions[(profile, percent)] for percent in flex]
+             for profile in profiles]
+    return charge_types, loads[np.array(index)]
+
+def zone_prices(df):
+    # HOURLY PRICE ($/MWh) OF ev_zone FROM prices.csv
+    _, hours = split_time_series(df)
+    return hours[str(ev_zone)].astype(float).to_numpy()
+
+def charging_costs(results_folders=results_folders, flex=None):
+    # ENERGY, COST AND AVERAGE PRICE OF EACH CHARGE TYPE IN EVERY SCENARIO
+    profiles = list(results_folders)
+    flex = list(scenario_folders(results_folders, flex))
+
+    prices = scenario_values('prices', zone_prices, flex, results_folders)
+    load = scenario_values('Load_data', lambda df: df[f'Load_MW_z{ev_zone}']
+                           .to_numpy(), flex, results_folders)
+    charge_types, ev_loads = ev_components(profiles, flex)
+
+    # The non-EV load is what the EV components don't explain, and should be
+    # the non-EV load the cases were made with
+    non_ev = load - ev_loads.sum(axis=2)
+    qld_loads = pd.read_csv(in_load_profile_folder(total_qld_loads))[
+        'Load (MW)'].to_numpy()
+    difference = np.abs(non_ev - qld_loads).max()
+    if difference > load_tolerance_MW:
+        raise ValueError(f"The EV load profiles differ from the EV load in "
+                         f"Load_data.csv by up to {difference:.3g} MW")
+
+    # (profile, flex %, charge type, hour)
+    components = np.concatenate([ev_loads, non_ev[:, :, np.newaxis]], axis=2)
+    names = charge_types + [other_load]
+
+    energy = components.sum(axis=-1) # MWh
+    cost = np.einsum('pfch,pfh->pfc', components, prices) # $
+    with np.errstate(divide='ignore', invalid='ignore'):
+        average_price = cost / energy
+    cost_share = 100 * cost / cost.sum(axis=-1, keepdims=True)
+
+    # TABLE: one row per (profile, flex %, charge type)
+    profile_grid, flex_grid, type_grid = np.meshgrid(profiles, flex, names,
+                                                     indexing='ij')
+    return pd.DataFrame({"profile": profile_grid.ravel(),
+                         "flex_percent": flex_grid.ravel(),
+                         "charge_type": type_grid.ravel(),
+                         "energy_GWh": energy.ravel() / 1000,
+                         "cost_million": cost.ravel() / 10**6,
+                         "average_price_per_MWh": average_price.ravel(),
+                         "cost_share_percent": cost_share.ravel()})
+
+
+if __name__ == "__main__":
+    os.chdir(processing_folder)
+    table = charging_costs()
+    table.to_csv(charging_cost_csv, index=False)
+
+    # AVERAGE PRICE PAID BY EACH CHARGE TYPE ($/MWh)
+    print(table.pivot_table(index=["profile", "flex_percent"],
+                            columns="charge_type",
+                            values="average_price_per_MWh", sort=False)
+          .round(2).to_string())
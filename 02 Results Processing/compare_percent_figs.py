@@ -10,19 +10,72 @@ within the main function.
 '''
 
 import pandas as pd
+from results_store import (hourly, annual_sum, resource_rows, load_by_zone,
+                           availability, aggregate, read_results_csv)
+from downsample import m4_indices
+from calendar_index import (day_hours, day_label, day_window, month_ticks,
+                            season_names, season_dates)
+from matplotlib.collections import PolyCollection
 import matplotlib.pyplot as plt
 import numpy as np
 
+# LEVEL OF DETAIL: full year plots only draw the first, last, min and max hour
+# of each pixel column (M4) of every line and filled edge, which looks the same
+# as drawing every hour, and filled areas are rasterized in vector files
+level_of_detail = True
+
+# DAYS PLOTTED: a date (or day of the year) for the day figures; the seasonal
+# figures take one per season (calendar_index.season_dates by default). Days
+# can also be picked from the results with calendar_index.py, e.g.
+# day_gen_graph(50, extreme_day(hourly(folder, 'curtail')['Total'], 'sum'))
+typical_date = '2050-04-05' # A weekday
+
+def lod_samples(ax, x, y, x_range):
+    # POSITIONS OF THE SAMPLES OF y TO DRAW ACROSS THE WIDTH OF ax (PIXELS)
+    fig = ax.get_figure()
+    dpi = plt.rcParams['savefig.dpi']
+    dpi = fig.dpi if dpi == 'figure' else dpi
+    n_columns = int(np.ceil(ax.get_position().width * fig.get_figwidth() * dpi))
+
+    return m4_indices(x, y, n_columns, x_range)
+
+def lod_fill_between(ax, x, y1, y2=0, x_range=None, **kwargs):
+    # SAME AS ax.fill_between(x, y1, y2), each edge drawn from its M4 samples
+    if not level_of_detail:
+        return ax.fill_between(x, y1, y2, **kwargs)
+
+    x = np.asarray(x, dtype=float)
+    y1 = np.asarray(y1, dtype=float)
+    y2 = np.broadcast_to(np.asarray(y2, dtype=float), y1.shape)
+    upper = lod_samples(ax, x, y1, x_range)
+    lower = lod_samples(ax, x, y2, x_range)[::-1]
+
+    # One polygon, as fill_between() draws
+    polygon = np.column_stack([np.concatenate([x[upper], x[lower]]),
+                               np.concatenate([y1[upper], y2[lower]])])
+    collection = PolyCollection([polygon], rasterized=True, **kwargs)
+    ax.add_collection(collection)
+    ax.autoscale_view()
+
+    return collection
+
+def lod_plot(ax, x, y, x_range=None, **kwargs):
+    # SAME AS ax.plot(x, y), drawn from the M4 samples
+    if not level_of_detail:
+        return ax.plot(x, y, **kwargs)
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    keep = lod_samples(ax, x, y, x_range)
+
+    return ax.plot(x[keep], y[keep], **kwargs)
+
 # Plot comparing capacity for 30% and 50% coord charging
 def process_cap_data(folder):
-    cap_file = f'{folder}capacity.csv'
-    cap_df = pd.read_csv(cap_file)    
-
-    cap_df = cap_df.iloc[:-1, [0, 2, 5]] # Remove irrelevant columns and rows    
-    cap_df.iloc[:, [1, 2]] /= 1000 # MW to GW    
-    cap_df.iloc[:, 0] = cap_df.iloc[:, 0].str.replace('QLD_', '') # Fix headings
+    cap_df = resource_rows(folder, 'capacity')[['StartCap', 'EndCap']]
+    cap_df = aggregate(cap_df, folder) / 1000 # MW to GW, by technology
 
-    cap_labels = cap_df['Resource']
+    cap_labels = cap_df.index
     start_cap = cap_df['StartCap']
     end_cap = cap_df['EndCap']
 
@@ -54,14 +107,10 @@ def compare_cap():
 
 # Plot comparing energy production for 30% and 50% coord charging
 def process_energy_data(folder):
-    power_file = f'{folder}power.csv'
-    power_df = pd.read_csv(power_file)
-    
-    power_df = power_df.iloc[[1], 1:-1]
+    power_df = aggregate(annual_sum(folder, 'power'), folder) # By technology
     ener_df = power_df * (8760/(1000)) # MW to GWh
-    ener_df.columns = ener_df.columns.str.replace('[_QLD]', '', regex=True) # Fix headings
 
-    return ener_df.iloc[0, :], ener_df.columns
+    return ener_df, ener_df.index
 
 def compare_energy():
     percent_coord1 = 30
@@ -86,20 +135,13 @@ def compare_energy():
     plt.show()
 
 # Plot of energy production over a typical day
-def day_gen_graph(percent_coord): # 30 - 50
-    day_index = 95 # 5th April
-
+def day_gen_graph(percent_coord, day=typical_date): # 30 - 50
     folder = f'Results{folder_num}/{percent_coord}/'
+    hours = day_hours(day) # Hours (t) of the day
 
-    power_file = f'{folder}power.csv'
-    power_df = pd.read_csv(power_file)
-
-    start_ind = day_index * 24 + 2
-    end_ind = start_ind + 24
-
-    power_df = power_df.iloc[start_ind: end_ind, 1:-1]
+    power_df = aggregate(hourly(folder, 'power'), folder, axis=1) # By technology
+    power_df = power_df.loc[hours]
     power_df /= 1000 # MW to GW
-    power_df.columns = power_df.columns.str.replace('[_QLD]', '', regex=True) # Fix headings
     cumulative = power_df.cumsum(axis=1)
 
     colors = ['yellow', 'limegreen', 'teal', 'pink', 'crimson', 'magenta', 'orange', 'darkviolet', 'lime', 'blue', 'cyan']
@@ -107,15 +149,15 @@ def day_gen_graph(percent_coord): # 30 - 50
 
     for i in range(power_df.shape[1]): 
         if i == 0:
-            plt.fill_between(power_df.index-start_ind, cumulative.iloc[:, i], 
+            plt.fill_between(power_df.index-hours[0], cumulative.iloc[:, i], 
                                 alpha=0.5, label=power_df.columns[i], 
-                                color=colors[i])
+                                color=colors[i % len(colors)])
         else:
-            plt.fill_between(power_df.index-start_ind, cumulative.iloc[:, i], 
+            plt.fill_between(power_df.index-hours[0], cumulative.iloc[:, i], 
                                 cumulative.iloc[:, i-1], alpha=0.5, 
-                                label=power_df.columns[i], color=colors[i])
+                                label=power_df.columns[i], color=colors[i % len(colors)])
 
-    plt.title(f'Power Generation for a Typical Weekday \n({percent_coord}% {coord_profile} Coordinated Charging Profile)')
+    plt.title(f'Power Generation on {day_label(day)} \n({percent_coord}% {coord_profile} Coordinated Charging Profile)')
 
     plt.xlabel('Hour')
     plt.xticks(range(0, 24, 2))
@@ -126,33 +168,26 @@ def day_gen_graph(percent_coord): # 30 - 50
     plt.savefig(f'{coord_profile} - day_gen_{percent_coord}.png')
     plt.show()
 
-def four_gen_profs(percent_coord):
+def four_gen_profs(percent_coord, days=season_dates):
     folder = f'Results{folder_num}/{percent_coord}/'
-    power_file = f'{folder}power.csv'
-    power_df = pd.read_csv(power_file)
-    power_df = power_df.iloc[:, 1:-1]
+    power_df = aggregate(hourly(folder, 'power'), folder, axis=1)  # By technology
     power_df /= 1000  # MW to GW
-    power_df.columns = power_df.columns.str.replace('[_QLD]', '', regex=True)  # Fix headings
     cumulative = power_df.cumsum(axis=1)
 
     colors = ['yellow', 'limegreen', 'teal', 'pink', 'crimson', 'magenta', 'orange', 'darkviolet', 'lime', 'blue',
               'cyan']
 
-    # 5th of Jan, April, July, October (all weekdays)
-    day_inds = [5, 95, 186, 278]
+    # A day of each season (days: {season: date or day of the year})
     season_cum_dfs = []
     season_pow_dfs = []
 
-    seasons = ['Summer', 'Autumn', 'Winter', 'Spring']
-
-    for ind in day_inds:
-        start_ind = (ind - 1) * 24
-        end_ind = start_ind + 24
+    seasons = season_names
 
-        season_cum_df = cumulative.iloc[start_ind:end_ind + 1].reset_index(drop=True)
+    for season in seasons:
+        season_cum_df = day_window(cumulative, days[season])
         season_cum_dfs.append(season_cum_df)
 
-        season_pow_df = power_df.iloc[start_ind:end_ind + 1].reset_index(drop=True)
+        season_pow_df = day_window(power_df, days[season])
         season_pow_dfs.append(season_pow_df)
 
     fig, axs = plt.subplots(2, 2, figsize=(12, 8))
@@ -160,18 +195,18 @@ def four_gen_profs(percent_coord):
     for i, ax in enumerate(axs.flatten()):
         for j in range(season_pow_dfs[i].shape[1]):
             if j == 0:
-                ax.fill_between(range(25), season_cum_dfs[i].iloc[:, j], alpha=0.5,
-                                label=power_df.columns[j], color=colors[j])
+                ax.fill_between(season_cum_dfs[i].index, season_cum_dfs[i].iloc[:, j], alpha=0.5,
+                                label=power_df.columns[j], color=colors[j % len(colors)])
             else:
-                ax.fill_between(range(25), season_cum_dfs[i].iloc[:, j], season_cum_dfs[i].iloc[:, j - 1],
-                                alpha=0.5, label=power_df.columns[j], color=colors[j])
+                ax.fill_between(season_cum_dfs[i].index, season_cum_dfs[i].iloc[:, j], season_cum_dfs[i].iloc[:, j - 1],
+                                alpha=0.5, label=power_df.columns[j], color=colors[j % len(colors)])
 
         ax.set_xlabel('Hour')
         ax.set_xlim(0, 24)
         ax.set_xticks(range(0, 24, 2))
         ax.set_ylabel('Power Generated (GW)')
         ax.set_ylim(0, 25)
-        ax.set_title(seasons[i])
+        ax.set_title(f'{seasons[i]} ({day_label(days[seasons[i]])})')
         ax.legend(loc='upper left', bbox_to_anchor=(1.02, 1))
 
     fig.suptitle(f'Seasonal Weekday Power Generation for {percent_coord}% {coord_profile} Coordinated Charging Profile ')
@@ -181,33 +216,31 @@ def four_gen_profs(percent_coord):
     plt.show()
 
 def year_gen(percent_coord):
-    # Create a list of abbreviated month names
-    months = ['J', 'F', 'M', 'A', 'M', 'J', 'J', 'A', 'S', 'O', 'N', 'D']
-    month_indices = [1, 32, 60, 91, 121, 152, 182, 213, 244, 274, 305, 335]
-    month_ind_new = [(ind - 1) * 24 for ind in month_indices]
+    # First hour of each month and abbreviated month names
+    month_ind_new, months = month_ticks()
 
     folder = f'Results{folder_num}/{percent_coord}/'
-    power_file = f'{folder}power.csv'
-    power_df = pd.read_csv(power_file)
-    power_df = power_df.iloc[:, 1:-1]
+    power_df = aggregate(hourly(folder, 'power'), folder, axis=1)  # By technology
+    power_df.index -= 1  # Hour of the year from 0
     power_df /= 1000  # MW to GW
-    power_df.columns = power_df.columns.str.replace('[_QLD]', '', regex=True)  # Fix headings
     cumulative = power_df.cumsum(axis=1)
 
     colors = ['yellow', 'limegreen', 'teal', 'pink', 'crimson', 'magenta', 'orange', 'darkviolet', 'lime', 'blue',
               'cyan']
 
     fig, ax = plt.subplots(figsize=(16, 4))  # Adjust the figure size as desired
+    fig.subplots_adjust(left=0.05, right=0.87)  # Adjust the right margin to accommodate the legend
 
     for i in range(power_df.shape[1]):
         if i == 0:
-            ax.fill_between(power_df.index, cumulative.iloc[:, i],
-                            alpha=0.5, label=power_df.columns[i],
-                            color=colors[i], linewidth=0.5)  # Set the linewidth
+            lod_fill_between(ax, power_df.index, cumulative.iloc[:, i],
+                             x_range=(0, 8760),
+                             alpha=0.5, label=power_df.columns[i],
+                             color=colors[i % len(colors)], linewidth=0.5)  # Set the linewidth
         else:
-            ax.fill_between(power_df.index, cumulative.iloc[:, i],
-                            cumulative.iloc[:, i-1], alpha=0.5,
-                            label=power_df.columns[i], color=colors[i], linewidth=0.5)  # Set the linewidth
+            lod_fill_between(ax, power_df.index, cumulative.iloc[:, i],
+                             cumulative.iloc[:, i-1], x_range=(0, 8760), alpha=0.5,
+                             label=power_df.columns[i], color=colors[i % len(colors)], linewidth=0.5)  # Set the linewidth
 
     ax.set_title(f'Power Generation for 2050 ({percent_coord}% {coord_profile} Coordinated Charging Profile)')
     ax.set_xlabel('Month')
@@ -217,21 +250,17 @@ def year_gen(percent_coord):
     ax.set_ylabel('Power Generated (GW)')
     ax.set_ylim(0, 30)
     ax.legend(loc='upper left', bbox_to_anchor=(1.02, 1))
-    fig.subplots_adjust(left=0.05, right=0.87)  # Adjust the right margin to accommodate the legend
     # plt.savefig(f'{coord_profile} - day_gen_{percent_coord}.png')
     plt.show()
 
 
 # Plot comparing the generator profit for 30% and 50% coord charging
 def process_profit_data(folder):
-    profit_file = f'{folder}NetRevenue.csv'
-    prof_df = pd.read_csv(profit_file)    
-    prof_df = prof_df.iloc[:, [1, -1]] # Remove irrelevant columns and rows    
-    prof_df.iloc[:, -1] /= 10**6 # Change from $ to $ million    
-    prof_df.iloc[:, 0] =prof_df.iloc[:, 0].str.replace('QLD_', '') # Fix headings
+    prof_df = resource_rows(folder, 'NetRevenue')['Profit']
+    prof_df = aggregate(prof_df, folder) / 10**6 # $ to $ million, by technology
 
-    prof_labels = prof_df.iloc[:, 0]
-    prof_vals = prof_df.iloc[:, 1]
+    prof_labels = prof_df.index
+    prof_vals = prof_df
 
     return prof_labels, prof_vals
 
@@ -260,8 +289,8 @@ def compare_profit():
 # Plot comparing the GenX objective function for all charging %s
 def process_cost_data(folder):
     cost_file = f'{folder}costs.csv'
-    cost_df = pd.read_csv(cost_file)
-    cost_df = cost_df.iloc[1, 1] # Remove irrelevant columns and rows
+    cost_df = read_results_csv(cost_file).set_index('Costs')
+    cost_df = cost_df.loc['cTotal', 'Total'] # Objective function value
     cost_df /= 10**9 # Change from $ to $ billion
 
     return cost_df
@@ -287,21 +316,16 @@ def compare_obj_func():
 # Plot comparing renewables curtailment for all charging %s
 def process_curtailment_data(folder):
 
-    power_file = f'{folder}power.csv'
-    curt_file = f'{folder}curtail.csv'
-
-    power_df = pd.read_csv(power_file)
-    power_df.columns = power_df.columns.str.replace('[_QLD]', '', regex=True) # Fix headings
+    power_df = aggregate(annual_sum(folder, 'power'), folder) # By technology
 
-    total_used_wind = power_df.iloc[1, 6]
-    total_used_solar = power_df.iloc[1, 7]
+    total_used_wind = power_df['wind']
+    total_used_solar = power_df['solar']
     total_used_renew = total_used_wind + total_used_solar
 
-    curt_df = pd.read_csv(curt_file)
-    curt_df.columns = curt_df.columns.str.replace('[_QLD]', '', regex=True) # Fix headings
+    curt_df = aggregate(annual_sum(folder, 'curtail'), folder) # By technology
 
-    total_curt_wind = curt_df.iloc[1, 6]
-    total_curt_solar = curt_df.iloc[1, 7]
+    total_curt_wind = curt_df['wind']
+    total_curt_solar = curt_df['solar']
     total_curt_renew = total_curt_wind + total_curt_solar
 
     curt_wind_percent = 100 * (total_curt_wind)/(total_curt_wind + total_used_wind)
@@ -339,115 +363,87 @@ def compare_curt():
     print(solar_curt)
     print(total_curt)
 
-def day_curt_graph(percent_coord): # 30 - 50
-    day_index = 95 # 5th April
-
-    start_ind = day_index * 24 + 2
-    end_ind = start_ind + 24
+def day_curt_graph(percent_coord, day=typical_date): # 30 - 50
+    hours = day_hours(day) # Hours (t) of the day
 
     folder = f'Results{folder_num}/{percent_coord}/'
-    cap_file = f'{folder}capacity.csv'
-    gen_var_file = f'{folder}Generators_variability.csv'
-    power_file = f'{folder}power.csv'
-
-    gen_var_df = pd.read_csv(gen_var_file)
-    gen_var_df = gen_var_df.iloc[:, [6, 7]] # Remove irrelevant columns and rows
-    gen_var_df.columns = gen_var_df.columns.str.replace('[_QLD]', '', regex=True) # Fix headings
-
-    cap_df = pd.read_csv(cap_file)
-    cap_df = cap_df.iloc[[5, 6], [0, 4]] # Remove irrelevant columns and rows
-    cap_df.iloc[:, 0] = cap_df.iloc[:, 0].str.replace('QLD_', '') # Fix headings
 
-    wind_inst_cap = cap_df.iloc[0, 1]
-    solar_inst_cap = cap_df.iloc[1, 1]
-
-    avail_power_df = gen_var_df.copy()
+    # Available power: availability times installed (end) capacity
+    inst_cap = resource_rows(folder, 'capacity')['EndCap']
+    gen_var_df = availability(folder).loc[hours]
+    avail_power_df = gen_var_df[inst_cap.index.intersection(gen_var_df.columns)] * inst_cap
+    avail_power_df = aggregate(avail_power_df, folder, axis=1) # By technology
     avail_power_df /= 1000 # MW to GW
-    avail_power_df['wind'] *= wind_inst_cap
-    avail_power_df['solar'] *= solar_inst_cap
-    avail_renew_power = avail_power_df.iloc[start_ind:end_ind, :]['wind'] + avail_power_df.iloc[start_ind:end_ind, :]['solar']
-    # avail_renew_power = avail_power_df.iloc[start_ind:end_ind, :]['wind']
+    avail_renew_power = avail_power_df['wind'] + avail_power_df['solar']
+    # avail_renew_power = avail_power_df['wind']
 
-    power_df = pd.read_csv(power_file)
-    power_df = power_df.iloc[start_ind: end_ind, [6, 7]]
+    power_df = aggregate(hourly(folder, 'power'), folder, axis=1).loc[hours] # By technology
     power_df /= 1000 # MW to GW
-    power_df.columns = power_df.columns.str.replace('[_QLD]', '', regex=True) # Fix headings
-    used_renew_power = power_df.iloc[:, 0] + power_df.iloc[:, 1]
-    # used_renew_power = power_df.iloc[:, 0]
+    used_renew_power = power_df['wind'] + power_df['solar']
+    # used_renew_power = power_df['wind']
     
     curt = avail_renew_power - used_renew_power
 
-    plt.bar(list(range(start_ind, end_ind)), used_renew_power, label='Generation', color='limegreen')
-    plt.bar(list(range(start_ind, end_ind)), curt, bottom=used_renew_power, label='Curtailment', color='red')
+    plt.bar(hours - hours[0], used_renew_power, label='Generation', color='limegreen')
+    plt.bar(hours - hours[0], curt, bottom=used_renew_power, label='Curtailment', color='red')
 
     # Customize the graph
     plt.xlabel('Hour')
-    plt.xticks(range(start_ind-day_index, 24, 2))
+    plt.xticks(range(0, 24, 2))
     plt.ylabel('Power Generation (GW)')
     plt.ylim(0, 10)
-    plt.title(f'Renewables Generation and Curtailment for a Typical Weekday \n({percent_coord}% {coord_profile} Coordinated Charging Profile)')
+    plt.title(f'Renewables Generation and Curtailment on {day_label(day)} \n({percent_coord}% {coord_profile} Coordinated Charging Profile)')
     plt.legend()
     plt.savefig(f'{coord_profile} - day_curt_{percent_coord}.png')
     plt.show()
 
-def four_curt_profs(percent_coord):
+def four_curt_profs(percent_coord, days=season_dates):
     folder = f'Results{folder_num}/{percent_coord}/'
 
-    power_file = f'{folder}power.csv'
-    curt_file = f'{folder}curtail.csv'
-
-    power_df = pd.read_csv(power_file)
-    power_df = power_df.iloc[2:, [6, 7]]
+    power_df = aggregate(hourly(folder, 'power'), folder, axis=1)[['wind', 'solar']] # By technology
     power_df /= 1000 # MW to GW
-    power_df.columns = power_df.columns.str.replace('[_QLD]', '', regex=True) # Fix headings
 
-    curt_df = pd.read_csv(curt_file)
-    curt_df = curt_df.iloc[2:, [6, 7]]
+    curt_df = aggregate(hourly(folder, 'curtail'), folder, axis=1)[['wind', 'solar']]
     curt_df /= 1000 # MW to GW
-    curt_df.columns = curt_df.columns.str.replace('[_QLD]', '', regex=True) # Fix headings
 
-    # 5th of Jan, April, July, October (all weekdays)
-    day_inds = [5, 95, 186, 278]
+    # A day of each season (days: {season: date or day of the year})
     season_gen_dfs = []
     season_wind_dfs = []
     season_solar_dfs = []
 
-    seasons = ['Summer', 'Autumn', 'Winter', 'Spring']
-
-    for ind in day_inds:
-        start_ind = (ind - 1) * 24
-        end_ind = start_ind + 24
+    seasons = season_names
 
-        used_wind_power = power_df.iloc[:, 0]
-        used_solar_power = power_df.iloc[:, 1]
+    for season in seasons:
+        used_wind_power = power_df['wind']
+        used_solar_power = power_df['solar']
         used_renew_power = used_wind_power + used_solar_power
 
-        wind_curt = curt_df.iloc[:, 0]
-        solar_curt = curt_df.iloc[:, 1]
+        wind_curt = curt_df['wind']
+        solar_curt = curt_df['solar']
         curt = wind_curt + solar_curt
 
-        season_gen_df = used_renew_power.iloc[start_ind:end_ind + 1].reset_index(drop=True)
+        season_gen_df = day_window(used_renew_power, days[season])
         season_gen_dfs.append(season_gen_df)
 
-        season_wind_df = wind_curt.iloc[start_ind:end_ind + 1].reset_index(drop=True)
+        season_wind_df = day_window(wind_curt, days[season])
         season_wind_dfs.append(season_wind_df)
 
-        season_solar_df = solar_curt.iloc[start_ind:end_ind + 1].reset_index(drop=True)
+        season_solar_df = day_window(solar_curt, days[season])
         season_solar_dfs.append(season_solar_df)
 
     fig, axs = plt.subplots(2, 2, figsize=(12, 8))
 
     for i, ax in enumerate(axs.flatten()):
-        ax.bar(range(25), season_gen_dfs[i], label='Generation', alpha=0.7, color='blue')
-        ax.bar(range(25), season_wind_dfs[i], label='Wind Curtailment', bottom=season_gen_dfs[i], alpha=0.7, color='red')
-        ax.bar(range(25), season_solar_dfs[i], label='Solar Curtailment', bottom=season_gen_dfs[i] + season_wind_dfs[i], alpha=0.7, color='gold')
+        ax.bar(season_gen_dfs[i].index, season_gen_dfs[i], label='Generation', alpha=0.7, color='blue')
+        ax.bar(season_gen_dfs[i].index, season_wind_dfs[i], label='Wind Curtailment', bottom=season_gen_dfs[i], alpha=0.7, color='red')
+        ax.bar(season_gen_dfs[i].index, season_solar_dfs[i], label='Solar Curtailment', bottom=season_gen_dfs[i] + season_wind_dfs[i], alpha=0.7, color='gold')
 
         ax.set_xticks(range(0, 25, 2))  # Set x-ticks to every second value
         ax.set_xticklabels(range(0, 25, 2))  # Set x-tick labels to every second value
         ax.set_xlabel('Hour')
         ax.set_ylabel('Power (GW)')
         ax.set_ylim(-1, 35)
-        ax.set_title(f'{seasons[i]}')
+        ax.set_title(f'{seasons[i]} ({day_label(days[seasons[i]])})')
 
         ax.legend()
 
@@ -459,9 +455,7 @@ def four_curt_profs(percent_coord):
 
 # Compare carbon emissions for all charging %s
 def process_emissions_data(folder):
-    emissions_file = f'{folder}emissions.csv'
-    emis_df = pd.read_csv(emissions_file)    
-    emis_df = emis_df.iloc[2:, 2] # Remove irrelevant columns and rows
+    emis_df = hourly(folder, 'emissions')['Total'] # All zones
     total_emis = emis_df.sum() 
     total_emis /= 1000 # Mt to Gt
 
@@ -486,10 +480,7 @@ def compare_emissions():
     print(emissions_vals)
 
 def process_year_load_data(folder):
-    load_file = f'{folder}Load_data.csv'
-
-    load_df = pd.read_csv(load_file)
-    load_df = load_df.iloc[:, 9] # Remove irrelevent columns
+    load_df = load_by_zone(folder).sum(axis=1) # All zones
     load_df /= 1000 # MW to GW
 
     return load_df
@@ -504,19 +495,14 @@ def compare_year_load():
     load_df1 = process_year_load_data(folder1)
     load_df2 = process_year_load_data(folder2)
 
-    # Create a list of abbreviated month names
-    months = ['J', 'F', 'M', 'A', 'M', 'J', 'J', 'A', 'S', 'O', 'N', 'D']
-    month_indices = [1, 32, 60, 91, 121, 152, 182, 213, 244, 274, 305, 335]
-    month_ind_new = []
-    for ind in month_indices:
-        ind = (ind-1)*24
-        month_ind_new.append(ind)
+    # First hour of each month and abbreviated month names
+    month_ind_new, months = month_ticks()
 
     # Create two subplots, one above the other
     fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 8), sharex=True)
 
     # Plot the data on the first subplot
-    ax1.plot(load_df1.index, load_df1, linewidth=0.5, color=neutral_color, label='30% Coord. Charging')
+    lod_plot(ax1, load_df1.index - 1, load_df1, x_range=(0, 8760), linewidth=0.5, color=neutral_color, label='30% Coord. Charging')
     ax1.set_title(f'Demand Load Over the Year of 2050 for {coord_profile} Coordinated Charging Profile')
     ax1.set_ylabel('Demand Load (GW)')
     ax1.set_xlim(0, 8760)
@@ -526,7 +512,7 @@ def compare_year_load():
     ax1.legend()
 
     # Plot the data on the second subplot
-    ax2.plot(load_df2.index, load_df2, linewidth=0.5, color=color_50, label='50% Coord. Charging')
+    lod_plot(ax2, load_df2.index - 1, load_df2, x_range=(0, 8760), linewidth=0.5, color=color_50, label='50% Coord. Charging')
     ax2.set_ylabel('Demand Load (GW)')
     ax2.set_xlim(0, 8760)
     ax2.set_ylim(5, 22)
@@ -538,7 +524,7 @@ def compare_year_load():
     plt.savefig(f'{coord_profile} - year_loads.png')
     plt.show()
 
-def four_load_profs():
+def four_load_profs(days=season_dates):
     percent_coord1 = 30
     percent_coord2 = 50
 
@@ -548,29 +534,23 @@ def four_load_profs():
     load_df1 = process_year_load_data(folder1)
     load_df2 = process_year_load_data(folder2)
 
-    # 5th of Jan , April, July, October (all weekdays)
-    day_inds = [5, 95, 186, 278]
+    # A day of each season (days: {season: date or day of the year})
     season_dfs1 = []
     season_dfs2 = []
 
-    seasons = ['Summer', 'Autumn', 'Winter', 'Spring']
-
-    for ind in day_inds:
-        start_ind = (ind-1) * 24
-        end_ind = start_ind + 24
+    seasons = season_names
 
-        season_day_df1 = load_df1.copy()
-        season_day_df1 = season_day_df1.iloc[start_ind:end_ind+1]
+    for season in seasons:
+        season_day_df1 = day_window(load_df1, days[season])
         season_dfs1.append(season_day_df1)
 
-        season_day_df2 = load_df2.copy()
-        season_day_df2 = season_day_df2.iloc[start_ind:end_ind+1]
+        season_day_df2 = day_window(load_df2, days[season])
         season_dfs2.append(season_day_df2)
 
     fig, axs = plt.subplots(2, 2, figsize=(12, 8))
 
     for i, ax in enumerate(axs.flatten()):
-        x_values = range(25)  # Create a range from 0 to 23
+        x_values = season_dfs1[i].index  # Hours 0 to 24
 
         ax.plot(x_values, season_dfs1[i], color=color_30, label='30% Coord.Charging')
         ax.plot(x_values, season_dfs2[i], color='blue', label='50% Coord. Charging')
@@ -579,7 +559,7 @@ def four_load_profs():
         ax.set_xticks(range(0, 24, 2))
         ax.set_ylabel('Demand Load (GW)')
         ax.set_ylim(7, 19)
-        ax.set_title(seasons[i])
+        ax.set_title(f'{seasons[i]} ({day_label(days[seasons[i]])})')
         ax.legend()
 
     fig.suptitle(f'Seasonal Weekday Demand Load Profiles for {coord_profile} Coordinated Charging Profile ')
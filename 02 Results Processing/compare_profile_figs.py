@@ -6,19 +6,18 @@ Functions used to create figures comparing the two coordinated charging profiles
 '''
 
 import pandas as pd
+from results_store import annual_sum, resource_rows, load_by_zone, aggregate
+from calendar_index import day_label, day_window, season_names, season_dates
 import matplotlib.pyplot as plt
 import numpy as np
 
 def process_year_load_data(folder):
-    load_file = f'{folder}Load_data.csv'
-
-    load_df = pd.read_csv(load_file)
-    load_df = load_df.iloc[:, 9] # Remove irrelevent columns
+    load_df = load_by_zone(folder).sum(axis=1) # All zones
     load_df /= 1000 # MW to GW
 
     return load_df
 
-def four_load_profs():
+def four_load_profs(days=season_dates):
     percent_coord = 35
 
     folder1 = f'Results1/{percent_coord}/'
@@ -27,29 +26,23 @@ def four_load_profs():
     load_df1 = process_year_load_data(folder1)
     load_df2 = process_year_load_data(folder2)
 
-    # 5th of Jan , April, July, October (all weekdays)
-    day_inds = [5, 95, 186, 278]
+    # A day of each season (days: {season: date or day of the year})
     season_dfs1 = []
     season_dfs2 = []
 
-    seasons = ['Summer', 'Autumn', 'Winter', 'Spring']
-
-    for ind in day_inds:
-        start_ind = (ind-1) * 24
-        end_ind = start_ind + 24
+    seasons = season_names
 
-        season_day_df1 = load_df1.copy()
-        season_day_df1 = season_day_df1.iloc[start_ind:end_ind+1]
+    for season in seasons:
+        season_day_df1 = day_window(load_df1, days[season])
         season_dfs1.append(season_day_df1)
 
-        season_day_df2 = load_df2.copy()
-        season_day_df2 = season_day_df2.iloc[start_ind:end_ind+1]
+        season_day_df2 = day_window(load_df2, days[season])
         season_dfs2.append(season_day_df2)
 
     fig, axs = plt.subplots(2, 2, figsize=(12, 8))
 
     for i, ax in enumerate(axs.flatten()):
-        x_values = range(25)  # Create a range from 0 to 23
+        x_values = season_dfs1[i].index  # Hours 0 to 24
 
         ax.plot(x_values, season_dfs1[i], color=color_day, label='Day Peak')
         ax.plot(x_values, season_dfs2[i], color=color_daynight, label='Day and Night Peaks')
@@ -58,7 +51,7 @@ def four_load_profs():
         ax.set_xticks(range(0, 24, 2))
         ax.set_ylabel('Demand Load (GW)')
         ax.set_ylim(7, 19)
-        ax.set_title(seasons[i])
+        ax.set_title(f'{seasons[i]} ({day_label(days[seasons[i]])})')
         ax.legend()
 
     fig.suptitle(f'Comparison of Seasonal Weekday Demand Load Profiles for 35% Coordinated Charging')
@@ -67,14 +60,10 @@ def four_load_profs():
     plt.show()
 
 def process_cap_data(folder):
-    cap_file = f'{folder}capacity.csv'
-    cap_df = pd.read_csv(cap_file)    
+    cap_df = resource_rows(folder, 'capacity')[['StartCap', 'EndCap']]
+    cap_df = aggregate(cap_df, folder) / 1000 # MW to GW, by technology
 
-    cap_df = cap_df.iloc[:-1, [0, 2, 5]] # Remove irrelevant columns and rows    
-    cap_df.iloc[:, [1, 2]] /= 1000 # MW to GW    
-    cap_df.iloc[:, 0] = cap_df.iloc[:, 0].str.replace('QLD_', '') # Fix headings
-
-    cap_labels = cap_df['Resource']
+    cap_labels = cap_df.index
     start_cap = cap_df['StartCap']
     end_cap = cap_df['EndCap']
 
@@ -104,14 +93,10 @@ def compare_cap():
     plt.show()
 
 def process_energy_data(folder):
-    power_file = f'{folder}power.csv'
-    power_df = pd.read_csv(power_file)
-    
-    power_df = power_df.iloc[[1], 1:-1]
+    power_df = aggregate(annual_sum(folder, 'power'), folder) # By technology
     ener_df = power_df * (8760/(1000)) # MW to GWh
-    ener_df.columns = ener_df.columns.str.replace('[_QLD]', '', regex=True) # Fix headings
 
-    return ener_df.iloc[0, :], ener_df.columns
+    return ener_df, ener_df.index
 
 def compare_energy():
     percent_coord = 35
@@ -135,14 +120,11 @@ def compare_energy():
     plt.show()
 
 def process_profit_data(folder):
-    profit_file = f'{folder}NetRevenue.csv'
-    prof_df = pd.read_csv(profit_file)    
-    prof_df = prof_df.iloc[:, [1, -1]] # Remove irrelevant columns and rows    
-    prof_df.iloc[:, -1] /= 10**6 # Change from $ to $ million    
-    prof_df.iloc[:, 0] =prof_df.iloc[:, 0].str.replace('QLD_', '') # Fix headings
-
-    prof_labels = prof_df.iloc[:, 0]
-    prof_vals = prof_df.iloc[:, 1]
+    prof_df = resource_rows(folder, 'NetRevenue')['Profit']
+    prof_df = aggregate(prof_df, folder) / 10**6 # $ to $ million, by technology
+
+    prof_labels = prof_df.index
+    prof_vals = prof_df
 
     return prof_labels, prof_vals
 
@@ -0,0 +1,103 @@
+'''
+Downsampling of hourly series for fast plotting.
+
+ - minmax_envelope(): min, max and mean of equal sized buckets, so peaks and
+   troughs are kept when drawn as a filled band,
+ - lttb(): Largest-Triangle-Three-Buckets, picking the points that best keep
+   the visual shape of a line,
+ - m4_indices(): the first, last, min and max sample of every pixel column
+   (M4), which draw the same line or filled area as every sample at that
+   width.
+
+All three work on arrays with leading axes (e.g. profile x flex % x hour),
+with every series downsampled at once.
+'''
+
+import numpy as np
+
+def minmax_envelope(values, n_buckets):
+    # MIN, MAX AND MEAN OF n_buckets EQUAL BUCKETS ALONG THE LAST AXIS
+    # Returns the bucket centres (in samples) and (..., n_buckets) arrays.
+    # Samples after the last full bucket are added to the last bucket
+    values = np.asarray(values, dtype=float)
+    n_samples = values.shape[-1]
+    bucket_size = n_samples // n_buckets
+
+    edges = np.arange(n_buckets) * bucket_size
+    lows = np.minimum.reduceat(values, edges, axis=-1)
+    highs = np.maximum.reduceat(values, edges, axis=-1)
+    counts = np.diff(np.append(edges, n_samples))
+    means = np.add.reduceat(values, edges, axis=-1) / counts
+
+    centres = edges + (counts - 1) / 2
+
+    return centres, lows, highs, means
+
+def lttb(values, n_out):
+    # LARGEST-TRIANGLE-THREE-BUCKETS DOWNSAMPLING ALONG THE LAST AXIS
+    # Returns the chosen sample indices and values, both (..., n_out).
+    # The first and last samples are always kept
+    values = np.asarray(values, dtype=float)
+    n_samples = values.shape[-1]
+    if n_out >= n_samples or n_out < 3:
+        indices = np.broadcast_to(np.arange(n_samples), values.shape)
+        return indices, values
+
+    series = values.reshape(-1, n_samples)
+    rows = np.arange(len(series))
+
+    # Buckets for every point except the first and last
+    edges = np.floor(np.linspace(1, n_samples - 1, n_out - 1)).astype(int)
+
+    chosen = np.empty((len(series), n_out), dtype=int)
+    chosen[:, 0] = 0
+    chosen[:, -1] = n_samples - 1
+
+    for bucket in range(n_out - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+
+        # Average point of the next bucket (the last point for the last one)
+        if bucket + 2 < len(edges):
+            next_x = (edges[bucket + 1] + edges[bucket + 2] - 1) / 2
+            next_y = series[:, edges[bucket + 1]:edges[bucket + 2]].mean(axis=1)
+        else:
+            next_x = n_samples - 1
+            next_y = series[:, -1]
+
+        # Triangle area of each point with the last chosen point (all series
+        # at once)
+        prev_x = chosen[:, bucket]
+        prev_y = series[rows, prev_x]
+        x = np.arange(start, end)
+        areas = np.abs((prev_x[:, np.newaxis] - next_x) *
+                       (series[:, start:end] - prev_y[:, np.newaxis]) -
+                       (prev_x[:, np.newaxis] - x) *
+                       (next_y - prev_y)[:, np.newaxis])
+
+        chosen[:, bucket + 1] = start + areas.argmax(axis=1)
+
+    out_shape = values.shape[:-1] + (n_out,)
+    return (chosen.reshape(out_shape),
+            series[rows[:, np.newaxis], chosen].reshape(out_shape))
+
+def m4_indices(x, values, n_columns, x_range=None):
+    # SAMPLES KEPT BY M4: FIRST, LAST, MIN AND MAX OF EACH OF n_COLUMNS
+    # x is sorted, values is (..., n_samples). Returns the sorted union of
+    # the kept samples of every series, so stacked series can share one x
+    x = np.asarray(x, dtype=float)
+    series = np.asarray(values, dtype=float).reshape(-1, len(x))
+    x_min, x_max = (x[0], x[-1]) if x_range is None else x_range
+
+    columns = ((x - x_min) / (x_max - x_min) * n_columns).astype(int)
+    columns = np.clip(columns, 0, n_columns - 1)
+    starts = np.flatnonzero(np.diff(columns, prepend=-1))
+    ends = np.append(starts[1:], len(x)) - 1
+
+    kept = [starts, ends]
+    for row in series:
+        # Sorted by column then value: each column's min is at its start and
+        # its max at its end
+        order = np.lexsort((row, columns))
+        kept.extend([order[starts], order[ends]])
+
+    return np.unique(np.concatenate(kept))
@@ -0,0 +1,130 @@
+'''
+Load and residual load duration curves of every scenario.
+
+The residual load is the demand load less the wind and solar power available
+(Generators_variability.csv availability times the installed capacity in
+capacity.csv), i.e. the load the rest of the system has to meet before any
+curtailment. The hourly series of every scenario are stacked into one
+(series x profile x flex % x hour) array and sorted in a single np.sort, so
+a duration curve is each row in descending order.
+
+duration_summary() gives the peak, the load exceeded in a given share of the
+hours and the hours of VRE surplus (negative residual load) per scenario, and
+plot_duration_curves() compares the curves of every scenario. extreme_days()
+finds the days of highest residual (net) load, curtailment and non-served
+energy and the typical weekday of every scenario (with calendar_index.py), for
+the day figures of compare_percent_figs.py.
+'''
+
+from kpi_engine import scenario_values, total_load, renewables
+from scenario_cube import (scenario_folders, results_folders,
+                           technology_resources, load_cube)
+from calendar_index import extreme_day, typical_day, daily, day_date
+import matplotlib.pyplot as plt
+import pandas as pd
+import numpy as np
+import os
+
+processing_folder = os.path.dirname(os.path.abspath(__file__))
+
+series_names = {"load": "Load", "residual_load": "Residual Load (Load - Wind - Solar)"}
+exceeded_percents = [1, 5, 50] # load exceeded in this % of hours
+
+def scenario_series(results_folders=results_folders, flex=None):
+    # HOURLY LOAD AND RESIDUAL LOAD (MW), each (profile, flex %, hour)
+    flex = list(scenario_folders(results_folders, flex))
+    techs = [name for names in technology_resources(
+                 renewables, results_folders, flex).values() for name in names]
+
+    load = scenario_values('Load_data', total_load, flex, results_folders)
+    availability = scenario_values(
+        'Generators_variability', lambda df: df[techs].to_numpy(), flex,
+        results_folders)
+    capacity = scenario_values(
+        'capacity', lambda df: df.set_index('Resource')['EndCap'][techs]
+        .to_numpy(), flex, results_folders)
+
+    available_vre = (availability * capacity[..., np.newaxis, :]).sum(axis=-1)
+
+    return flex, {"load": load, "residual_load": load - available_vre}
+
+def duration_curves(series):
+    # EVERY SERIES SORTED IN DESCENDING ORDER, as (series, profile, flex %, hour)
+    return -np.sort(-np.stack(list(series.values())), axis=-1)
+
+def duration_summary(curves, profiles, flex):
+    # PEAKS, EXCEEDED LOADS AND SURPLUS HOURS PER SCENARIO (GW)
+    n_hours = curves.shape[-1]
+    profile_grid, flex_grid = np.meshgrid(profiles, flex, indexing='ij')
+    table = pd.DataFrame({"profile": profile_grid.ravel(),
+                          "flex_percent": flex_grid.ravel()})
+
+    for curve, name in zip(curves / 1000, series_names):
+        table[f"{name}_peak_GW"] = curve[..., 0].ravel()
+        for percent in exceeded_percents:
+            hour = int(np.ceil(n_hours * percent / 100)) - 1
+            table[f"{name}_exceeded_{percent}pct_GW"] = curve[..., hour].ravel()
+        table[f"{name}_min_GW"] = curve[..., -1].ravel()
+
+    table["surplus_hours"] = (curves[1] < 0).sum(axis=-1).ravel()
+
+    return table
+
+def extreme_days(results_folders=results_folders, flex=None):
+    # DATES OF THE EXTREME AND TYPICAL DAYS OF EVERY SCENARIO
+    # (no date where there's no curtailment or non-served energy)
+    flex, series = scenario_series(results_folders, flex)
+    curtail = load_cube('curtail', results_folders, flex).sel(resource='Total')
+    nse = load_cube('nse', results_folders, flex).sel(resource='Total')
+
+    days = {"max_net_load": extreme_day(series["residual_load"]),
+            "max_curtailment": np.where(daily(curtail, 'sum').max(axis=-1) > 0,
+                                        extreme_day(curtail, 'sum'), 0),
+            "max_nse": np.where(daily(nse, 'sum').max(axis=-1) > 0,
+                                extreme_day(nse, 'sum'), 0),
+            "typical_weekday": typical_day(series["load"])}
+
+    profile_grid, flex_grid = np.meshgrid(list(results_folders), flex,
+                                          indexing='ij')
+    table = pd.DataFrame({"profile": profile_grid.ravel(),
+                          "flex_percent": flex_grid.ravel()})
+    for name, day in days.items():
+        table[name] = [day_date(int(d)).date() if d else None
+                       for d in day.ravel()]
+
+    return table
+
+def plot_duration_curves(curves, profiles, flex):
+    fig, axes = plt.subplots(1, len(series_names), figsize=(14, 5), sharey=True)
+    hours_percent = 100 * np.arange(1, curves.shape[-1] + 1) / curves.shape[-1]
+    colors = plt.cm.viridis(np.linspace(0, 0.9, len(flex)))
+    linestyles = ['-', '--', ':', '-.']
+
+    for ax, curve, title in zip(axes, curves / 1000, series_names.values()):
+        for p, profile in enumerate(profiles):
+            for f, percent in enumerate(flex):
+                ax.plot(hours_percent, curve[p, f], color=colors[f],
+                        linestyle=linestyles[p % len(linestyles)],
+                        linewidth=1, label=f'{percent}% {profile}')
+        ax.axhline(0, color='grey', linewidth=0.5)
+        ax.set_title(title)
+        ax.set_xlabel('Hours of the Year (%)')
+        ax.set_xlim(0, 100)
+
+    axes[0].set_ylabel('Power (GW)')
+    axes[-1].legend(loc='upper left', bbox_to_anchor=(1.02, 1), fontsize='small')
+    fig.suptitle('Duration Curves for 2050 (All Coordinated Charging Scenarios)')
+    fig.tight_layout()
+    plt.savefig('duration_curves.png')
+    plt.show()
+
+
+if __name__ == "__main__":
+    os.chdir(processing_folder)
+    flex, series = scenario_series()
+    profiles = list(results_folders)
+    curves = duration_curves(series)
+
+    print(duration_summary(curves, profiles, flex).to_string(index=False))
+    print(extreme_days().to_string(index=False))
+    plot_duration_curves(curves, profiles, flex)
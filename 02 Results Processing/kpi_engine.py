@@ -0,0 +1,137 @@
+'''
+Key performance indicators of every scenario in one table.
+
+kpi_table() reads each output once for all scenarios (with scenario_cube.py)
+and computes every KPI as an array operation over (profile x flex %), giving
+one row per scenario:
+
+ - objective_cost_bn: total cost of the GenX objective ($ billion),
+ - emissions: annual emissions (as in emissions.csv),
+ - curtailed_<tech>_GWh and curtailment_<tech>_percent for wind, solar and
+   both together (renewables),
+ - nse_GWh and nse_hours: non-served energy and the hours with any,
+ - peak_load_GW, max_ramp_up_GW_per_h and max_ramp_down_GW_per_h of the
+   demand load,
+ - capacity_factor_<resource>: annual generation over end capacity for every
+   resource with capacity.
+
+save_kpis() writes the table to CSV, or Parquet for a .parquet filename when
+pandas has a Parquet engine (pyarrow or fastparquet; otherwise a CSV of the
+same name is written instead), so scenarios can be ranked by any column.
+'''
+
+from results_store import read_results_csv, results_file
+from scenario_cube import load_cube, results_folders, technology_resources
+import pandas as pd
+import numpy as np
+import sys
+import os
+
+processing_folder = os.path.dirname(os.path.abspath(__file__))
+kpi_csv = "scenario_kpis.csv"
+
+renewables = ["wind", "solar"] # technologies
+hours_per_year = 8760
+min_capacity_MW = 1 # resources with less have no capacity factor
+nse_threshold_MW = 1e-3 # hours with less non-served energy count as served
+
+def scenario_values(filename, read, flex, results_folders=results_folders):
+    # read(DataFrame) OF filename IN EVERY SCENARIO, as (profile, flex %, ...)
+    return np.array([[read(read_results_csv(results_file(
+                          os.path.join(folder, str(percent)), filename)))
+                      for percent in flex]
+                     for folder in results_folders.values()], dtype=float)
+
+def total_load(df):
+    # HOURLY DEMAND OF ALL ZONES (MW)
+    return df.filter(regex=r'^Load_MW_z\d+$').sum(axis=1).to_numpy()
+
+def objective_cost(df):
+    return df.set_index(df.columns[0]).loc['cTotal', 'Total']
+
+def kpi_table(results_folders=results_folders, flex=None):
+    # ONE ROW OF KPIs PER SCENARIO
+    power = load_cube('power', results_folders, flex)
+    profiles, flex = power.profiles, list(power.flex)
+    curtail = load_cube('curtail', results_folders, flex)
+    nse = load_cube('nse', results_folders, flex)
+    emissions = load_cube('emissions', results_folders, flex)
+
+    load = scenario_values('Load_data', total_load, flex, results_folders)
+    cost = scenario_values('costs', objective_cost, flex, results_folders)
+
+    # End capacity of the resources of power.csv, in the same order
+    resources = [resource for resource in power.resources if resource != 'Total']
+    capacity = scenario_values(
+        'capacity', lambda df: df.set_index('Resource')['EndCap']
+        .reindex(resources).to_numpy(), flex, results_folders)
+
+    kpis = {"objective_cost_bn": cost / 10**9,
+            "emissions": emissions.sel(resource='Total', annual=True)}
+
+    # CURTAILMENT: summed over the resources of each technology (any zone)
+    tech_resources = technology_resources(renewables, results_folders, flex)
+    used = np.stack([power.sel(resource=names, annual=True).sum(axis=-1)
+                     for names in tech_resources.values()], axis=-1)
+    curtailed = np.stack([curtail.sel(resource=names, annual=True).sum(axis=-1)
+                          for names in tech_resources.values()], axis=-1)
+    for i, tech in enumerate(renewables):
+        kpis[f"curtailed_{tech}_GWh"] = curtailed[..., i] / 1000
+        kpis[f"curtailment_{tech}_percent"] = \
+            100 * curtailed[..., i] / (curtailed[..., i] + used[..., i])
+    kpis["curtailed_renewables_GWh"] = curtailed.sum(axis=-1) / 1000
+    kpis["curtailment_renewables_percent"] = 100 * curtailed.sum(axis=-1) / \
+        (curtailed.sum(axis=-1) + used.sum(axis=-1))
+
+    # NON-SERVED ENERGY
+    kpis["nse_GWh"] = nse.sel(resource='Total', annual=True) / 1000
+    kpis["nse_hours"] = (nse.sel(resource='Total') > nse_threshold_MW).sum(axis=-1)
+
+    # DEMAND LOAD
+    ramps = np.diff(load, axis=-1)
+    kpis["peak_load_GW"] = load.max(axis=-1) / 1000
+    kpis["max_ramp_up_GW_per_h"] = ramps.max(axis=-1) / 1000
+    kpis["max_ramp_down_GW_per_h"] = -ramps.min(axis=-1) / 1000
+
+    # CAPACITY FACTORS
+    generated = power.sel(resource=resources, annual=True)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        capacity_factors = np.where(capacity >= min_capacity_MW,
+                                    generated / (capacity * hours_per_year),
+                                    np.nan)
+    for i, resource in enumerate(resources):
+        kpis[f"capacity_factor_{resource}"] = capacity_factors[..., i]
+
+    # TABLE: one row per (profile, flex %)
+    profile_grid, flex_grid = np.meshgrid(profiles, flex, indexing='ij')
+    table = pd.DataFrame({"profile": profile_grid.ravel(),
+                          "flex_percent": flex_grid.ravel()})
+    for name, values in kpis.items():
+        table[name] = np.asarray(values).ravel()
+
+    return table
+
+def save_kpis(table, filename=kpi_csv):
+    # Returns the filename written
+    if filename.endswith('.parquet'):
+        try:
+            table.to_parquet(filename, index=False)
+            return filename
+        except ImportError: # no Parquet engine installed
+            filename = os.path.splitext(filename)[0] + '.csv'
+            print(f"No Parquet engine (pyarrow or fastparquet), "
+                  f"writing {filename} instead")
+
+    table.to_csv(filename, index=False)
+    return filename
+
+
+if __name__ == "__main__":
+    os.chdir(processing_folder)
+    table = kpi_table()
+    save_kpis(table, sys.argv[1] if len(sys.argv) > 1 else kpi_csv)
+
+    # SCENARIOS RANKED BY RENEWABLE CURTAILMENT
+    print(table.sort_values("curtailment_renewables_percent")
+          [["profile", "flex_percent", "curtailment_renewables_percent",
+            "objective_cost_bn", "emissions", "nse_GWh"]].to_string(index=False))
@@ -0,0 +1,183 @@
+'''
+Render every thesis figure without opening plot windows.
+
+Each figure function of compare_percent_figs.py (for both coordinated
+charging profiles and, where it takes one, every flex percentage) and of
+compare_profile_figs.py is a job. Jobs are run in a process pool on the
+non-interactive Agg backend, with the module globals that the __main__
+blocks set (coord_profile, folder_num and the colours). Figures are written
+to output_folder: plt.savefig() calls are redirected there and a figure that
+is only shown (plt.show()) is saved as "<job name>.png".
+
+A job is skipped when the results CSVs it reads (and the Generators_data.csv
+of their cases) and the code of its module are unchanged since its figures
+were last rendered (hashes are kept in manifest_json inside output_folder).
+'''
+
+from results_store import generators_file
+from concurrent.futures import ProcessPoolExecutor
+import hashlib
+import glob
+import json
+import sys
+import os
+
+processing_folder = os.path.dirname(os.path.abspath(__file__))
+output_folder = "Figures"
+manifest_json = "figures_manifest.json"
+
+results_folders = {"Day Peak": 1, "Day and Night Peaks": 2}
+percent_coords = [30, 35, 40, 45, 50]
+
+# FIGURE FUNCTIONS: (function, takes a percentage)
+percent_figs = [("compare_cap", False), ("compare_energy", False),
+                ("compare_profit", False), ("compare_curt", False),
+                ("compare_year_load", False), ("four_load_profs", False),
+                ("day_gen_graph", True), ("four_gen_profs", True),
+                ("year_gen", True), ("day_curt_graph", True),
+                ("four_curt_profs", True)]
+profile_figs = ["four_load_profs", "compare_cap", "compare_energy",
+                "compare_profit"]
+
+# Module globals set in the __main__ blocks
+percent_figs_colors = {"color_30": 'cyan', "color_50": 'darkturquoise',
+                       "neutral_color": 'orange'}
+profile_figs_colors = {"color_day": 'blue', "color_daynight": 'magenta',
+                       "neutral_color": 'orange'}
+
+def figure_jobs():
+    # EVERY FIGURE AS A JOB: name, module, function, args, globals and the
+    # results folders it reads
+    jobs = []
+    for coord_profile, folder_num in results_folders.items():
+        module_globals = dict(percent_figs_colors, coord_profile=coord_profile,
+                              folder_num=folder_num)
+
+        for function, takes_percent in percent_figs:
+            if takes_percent:
+                for percent in percent_coords:
+                    jobs.append({
+                        "name": f"{coord_profile} - {function}_{percent}",
+                        "module": "compare_percent_figs",
+                        "function": function, "args": [percent],
+                        "globals": module_globals,
+                        "inputs": [f"Results{folder_num}/{percent}"]})
+            else:
+                jobs.append({
+                    "name": f"{coord_profile} - {function}",
+                    "module": "compare_percent_figs",
+                    "function": function, "args": [],
+                    "globals": module_globals,
+                    "inputs": [f"Results{folder_num}/{percent}"
+                               for percent in percent_coords]})
+
+    for function in profile_figs:
+        jobs.append({
+            "name": f"Compare - {function}", "module": "compare_profile_figs",
+            "function": function, "args": [], "globals": profile_figs_colors,
+            "inputs": [f"Results{folder_num}/35"
+                       for folder_num in results_folders.values()]})
+
+    return jobs
+
+def file_hash(filename):
+    with open(filename, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+def job_hash(job, file_hashes):
+    # HASH OF A JOB'S SETTINGS, ITS MODULE'S CODE AND THE CSVs IT READS
+    digest = hashlib.sha256(json.dumps(
+        [job["function"], job["args"], job["globals"]]).encode())
+
+    code_files = [f"{job['module']}.py", "results_store.py", "downsample.py",
+                  "calendar_index.py"]
+    data_files = sorted(filename for folder in job["inputs"]
+                        for filename in glob.glob(f"{folder}/*.csv")
+                        + [generators_file(folder)])
+
+    for filename in code_files + data_files:
+        if filename not in file_hashes:
+            file_hashes[filename] = file_hash(filename)
+        digest.update(filename.encode())
+        digest.update(file_hashes[filename].encode())
+
+    return digest.hexdigest()
+
+def render_job(job, output_folder=output_folder):
+    # RUN ONE FIGURE FUNCTION ON THE Agg BACKEND, returns the images written
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    import importlib
+
+    module = importlib.import_module(job["module"])
+    for name, value in job["globals"].items():
+        setattr(module, name, value)
+
+    written = []
+    original_savefig, original_show = plt.savefig, plt.show
+
+    def savefig(fname, *args, **kwargs):
+        path = os.path.join(output_folder, os.path.basename(str(fname)))
+        original_savefig(path, *args, **kwargs)
+        written.append(path)
+
+    def show(*args, **kwargs):
+        # Figures that were only shown are saved under the job name
+        if not written:
+            savefig(f"{job['name']}.png")
+        plt.close('all')
+
+    plt.savefig, plt.show = savefig, show
+    try:
+        getattr(module, job["function"])(*job["args"])
+    finally:
+        plt.savefig, plt.show = original_savefig, original_show
+        plt.close('all')
+
+    return written
+
+def render_figures(jobs=None, processes=os.cpu_count(), force=False):
+    # RENDER EVERY FIGURE WHOSE INPUTS OR CODE CHANGED
+    # Returns {job name: "rendered", "up to date" or "failed: <error>"}
+    os.chdir(processing_folder)
+    os.makedirs(output_folder, exist_ok=True)
+    if jobs is None:
+        jobs = figure_jobs()
+
+    manifest_path = os.path.join(output_folder, manifest_json)
+    manifest = {}
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+
+    file_hashes = {}
+    hashes = {job["name"]: job_hash(job, file_hashes) for job in jobs}
+
+    stale = [job for job in jobs if force
+             or manifest.get(job["name"], {}).get("hash") != hashes[job["name"]]
+             or not all(os.path.exists(path) for path in
+                        manifest[job["name"]]["files"])]
+
+    status = {job["name"]: "up to date" for job in jobs}
+    with ProcessPoolExecutor(max(1, processes)) as pool:
+        futures = {job["name"]: pool.submit(render_job, job) for job in stale}
+
+        for name, future in futures.items():
+            try:
+                manifest[name] = {"hash": hashes[name],
+                                  "files": future.result()}
+                status[name] = "rendered"
+            except Exception as error:
+                manifest.pop(name, None)
+                status[name] = f"failed: {error!r}"
+
+    with open(manifest_path, 'w') as f:
+        json.dump(manifest, f, indent=4)
+
+    return status
+
+
+if __name__ == "__main__":
+    for name, status in render_figures(force="--force" in sys.argv).items():
+        print(f"{name}: {status}")
@@ -0,0 +1,252 @@
+'''
+Cached reader for the GenX results CSVs.
+
+read_results_csv() returns the same DataFrame as pd.read_csv(), but each CSV
+is only parsed once: its columns are saved as typed .npy files (one per
+numeric column) in a .results_cache folder next to the CSV. Read back, the
+numeric columns are memory maps of these files rather than copies, so only
+the parts of a CSV that are used are read from disk. The maps are copy on
+write: changing a returned DataFrame never changes the cache or later reads.
+A cache entry is used while the CSV's size and modification time are
+unchanged, or while its contents hash the same (e.g. after the file is copied
+or touched). CSVs in the GenX case folders are cached in the .results_cache
+folder of this folder instead (keyed by a hash of their path), as every file
+in a case folder is an input of its run (run_cases.py).
+
+The time series outputs (power.csv, curtail.csv, charge.csv, storage.csv, ...)
+have a Resource row of headings followed by a Zone row, usually an AnnualSum
+row, and then one row per hour (t1, t2, ...). hourly(), annual_sum() and
+zones() give these parts labelled by resource name, e.g.
+
+    hourly('Results1/30/', 'power')['QLD_wind']
+
+Resources are described by the Generators_data.csv of the case the results
+came from (generators_data()), so results can be selected and summed by zone,
+region or technology (select_resources() and aggregate()) rather than by
+column position or resource name, e.g.
+
+    aggregate(hourly('Results1/30/', 'power'), 'Results1/30/', axis=1)['wind']
+'''
+
+import pandas as pd
+import numpy as np
+import hashlib
+import glob
+import json
+import os
+
+cache_folder_name = '.results_cache'
+
+processing_folder = os.path.dirname(os.path.abspath(__file__))
+genx_cases_folder = os.path.join(os.path.dirname(processing_folder),
+                                 '01 GenX Cases')
+# Case folders the results folders were copied from: Results<n>/<flex %> is the
+# Results folder of <case profile folder>/<date>_<flex %>_flex
+case_profile_folders = {'Results1': '01 Day Peak',
+                        'Results2': '02 Day and Night Peaks'}
+
+# Names of GenX Resource_Types as technologies (others keep their own name)
+technology_names = {'coal_ccs': 'coal CCS', 'ccgt': 'CCGT', 'ccgt_ccs': 'CCGT CCS',
+                    'ocgt': 'OCGT', 'wind_util': 'wind', 'solar_util': 'solar',
+                    'Biomass': 'biomass', 'battery_util': 'battery'}
+
+# Cache entries already checked in this run: {csv path: (stamp, meta)}
+_entries = {}
+
+def file_stamp(filename):
+    stat = os.stat(filename)
+    return [stat.st_size, stat.st_mtime_ns]
+
+def file_hash(filename):
+    with open(filename, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+def entry_folder(filename):
+    path = os.path.abspath(filename)
+    folder, name = os.path.split(path)
+
+    # Nothing is written inside the GenX case folders
+    if os.path.commonpath([path, genx_cases_folder]) == genx_cases_folder:
+        path_hash = hashlib.sha256(path.encode()).hexdigest()[:16]
+        return os.path.join(processing_folder, cache_folder_name,
+                            f'{path_hash}_{name}')
+
+    return os.path.join(folder, cache_folder_name, name)
+
+def save_entry(filename, df, stamp, sha):
+    # ONE .npy PER NUMERIC COLUMN, text columns and column names in meta.json
+    folder = entry_folder(filename)
+    os.makedirs(folder, exist_ok=True)
+
+    columns = []
+    for i, col in enumerate(df.columns):
+        if df[col].dtype == object:
+            columns.append({'name': col, 'values': df[col].tolist()})
+        else:
+            np.save(os.path.join(folder, f'{i}.npy'), df[col].to_numpy())
+            columns.append({'name': col})
+
+    # meta.json is written last so an interrupted save is never used
+    with open(os.path.join(folder, 'meta.json'), 'w') as f:
+        json.dump({'stamp': stamp, 'sha256': sha, 'columns': columns}, f)
+
+def load_entry(filename, stamp):
+    # DataFrame FROM THE DISK CACHE, or None if it is missing or out of date
+    folder = entry_folder(filename)
+    if filename in _entries and _entries[filename][0] == stamp:
+        meta = _entries[filename][1]
+    else:
+        meta_json = os.path.join(folder, 'meta.json')
+        if not os.path.exists(meta_json):
+            return None
+
+        with open(meta_json) as f:
+            meta = json.load(f)
+
+        if meta['stamp'] != stamp:
+            if meta['sha256'] != file_hash(filename):
+                return None
+
+            # Same contents with a new modification time
+            meta['stamp'] = stamp
+            with open(meta_json, 'w') as f:
+                json.dump(meta, f)
+
+        _entries[filename] = (stamp, meta)
+
+    # Numeric columns are copy on write memory maps ('c'): the DataFrame can
+    # be changed without changing the .npy files
+    data = {}
+    for i, col in enumerate(meta['columns']):
+        if 'values' in col:
+            data[col['name']] = pd.Series(col['values'], dtype=object)
+        else:
+            data[col['name']] = np.load(os.path.join(folder, f'{i}.npy'),
+                                        mmap_mode='c')
+
+    return pd.DataFrame(data, copy=False)
+
+def read_results_csv(filename):
+    # SAME AS pd.read_csv(filename), PARSED ONCE
+    path = os.path.abspath(filename)
+    stamp = file_stamp(path)
+
+    df = load_entry(path, stamp)
+    if df is None:
+        save_entry(path, pd.read_csv(path), stamp, file_hash(path))
+        df = load_entry(path, stamp)
+
+    return df
+
+def results_file(folder, name):
+    # e.g. ('Results1/30/', 'power') -> 'Results1/30/power.csv'
+    return os.path.join(folder, name if name.endswith('.csv') else f'{name}.csv')
+
+def split_time_series(df):
+    # SPLIT A TIME SERIES OUTPUT INTO ITS LABELLED ROWS AND HOURLY ROWS
+    # The first column holds the row labels (Resource, Zone, Segment, ...)
+    df = df.set_index(df.columns[0])
+    is_hour = df.index.str.fullmatch(r't\d+')
+
+    return df[~is_hour], df[is_hour]
+
+def hourly(folder, name):
+    # HOURLY VALUES OF A TIME SERIES OUTPUT, columns labelled by resource
+    # Index is the hour of the year (1-8760)
+    _, hours = split_time_series(read_results_csv(results_file(folder, name)))
+    values = hours.astype(float)
+    values.index = values.index.str.lstrip('t').astype(int)
+    values.index.name = 'Hour'
+
+    return values
+
+def annual_sum(folder, name):
+    # ANNUAL SUM OF EACH RESOURCE OF A TIME SERIES OUTPUT
+    labelled, _ = split_time_series(read_results_csv(results_file(folder, name)))
+    return labelled.loc['AnnualSum'].astype(float)
+
+def zones(folder, name):
+    # ZONE OF EACH RESOURCE OF A TIME SERIES OUTPUT (Total is zone 0)
+    labelled, _ = split_time_series(read_results_csv(results_file(folder, name)))
+    return labelled.loc['Zone'].astype(int)
+
+def resource_rows(folder, name):
+    # OUTPUT WITH ONE ROW PER RESOURCE (capacity.csv, NetRevenue.csv, ...)
+    # Indexed by resource name, without the Total row
+    df = read_results_csv(results_file(folder, name)).set_index('Resource')
+    return df.drop(index='Total', errors='ignore')
+
+def load_by_zone(folder):
+    # HOURLY DEMAND (MW) OF EACH ZONE FROM Load_data.csv, columns are zones
+    df = read_results_csv(results_file(folder, 'Load_data'))
+    load = df.filter(regex=r'^Load_MW_z\d+$')
+    load.columns = load.columns.str.replace('Load_MW_z', '').astype(int)
+    load.index = df['Time_Index'].astype(int)
+    load.index.name = 'Hour'
+
+    return load
+
+def availability(folder):
+    # HOURLY AVAILABILITY (0-1) OF EACH RESOURCE FROM Generators_variability.csv
+    df = read_results_csv(results_file(folder, 'Generators_variability'))
+    df = df.set_index('Time_Index')
+    df.index.name = 'Hour'
+
+    return df
+
+def generators_file(folder):
+    # Generators_data.csv OF THE CASE THAT WROTE THE RESULTS IN folder
+    # Looked for in folder, in its parent (a case's Results folder) and in the
+    # case folder it was copied from
+    folder = os.path.abspath(folder)
+    results_name, percent = os.path.split(folder)
+    results_name = os.path.basename(results_name)
+
+    candidates = [os.path.join(folder, 'Generators_data.csv'),
+                  os.path.join(os.path.dirname(folder), 'Generators_data.csv')]
+    if results_name in case_profile_folders:
+        candidates += sorted(glob.glob(os.path.join(
+            genx_cases_folder, case_profile_folders[results_name],
+            f'*_{percent}_flex', 'Generators_data.csv')))
+
+    for filename in candidates:
+        if os.path.exists(filename):
+            return filename
+
+    raise FileNotFoundError(f"No Generators_data.csv for the results in {folder}")
+
+def generators_data(folder):
+    # REGION, ZONE, RESOURCE TYPE AND TECHNOLOGY OF EVERY RESOURCE
+    # Indexed by resource name, in the order of Generators_data.csv
+    df = read_results_csv(generators_file(folder)).set_index('Resource')
+    df['technology'] = df['Resource_Type'].map(
+        lambda resource_type: technology_names.get(resource_type, resource_type))
+
+    return df
+
+def select_resources(folder, technology=None, zone=None):
+    # NAMES OF THE RESOURCES OF THE GIVEN TECHNOLOGIES AND ZONES
+    # Each can be one value, a list or None (any)
+    df = generators_data(folder)
+    selected = np.ones(len(df), dtype=bool)
+    for column, values in [('technology', technology), ('Zone', zone)]:
+        if values is not None:
+            selected &= df[column].isin(np.atleast_1d(values))
+
+    return list(df.index[selected])
+
+def aggregate(values, folder, by='technology', axis=0):
+    # SUM OF values BY TECHNOLOGY, ZONE, REGION, ... (a column of
+    # generators_data(), or a list of them for a MultiIndex)
+    # Resources are the index (axis=0) or the columns (axis=1) of values.
+    # Anything that isn't a resource (e.g. Total) is dropped
+    df = generators_data(folder)
+    if axis == 1:
+        values = values.T
+
+    values = values[values.index.isin(df.index)]
+    keys = [df.loc[values.index, column] for column in np.atleast_1d(by)]
+    grouped = values.groupby(keys[0] if isinstance(by, str) else keys,
+                             sort=False).sum()
+
+    return grouped.T if axis == 1 else grouped
@@ -0,0 +1,136 @@
+'''
+Load one GenX output for every scenario into a single labelled array.
+
+load_cube('power') reads power.csv from every flex percentage folder of
+Results1 (Day Peak) and Results2 (Day and Night Peaks) and stacks them into
+a ScenarioCube with values of shape (profile x flex % x resource x hour), so
+metrics across scenarios are single array reductions, e.g.
+
+    cube = load_cube('power')
+    cube.sel(resource='QLD_wind').sum(axis=-1)      # (profile, flex %)
+    cube.annual.max(axis=1)                          # (profile, resource)
+
+Scenario folders are found from the folder names (any numeric folder is a
+flex percentage) and read concurrently with a thread pool through
+results_store.py, so repeated loads use the cached columns.
+'''
+
+from results_store import (read_results_csv, results_file, split_time_series,
+                           select_resources)
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+import numpy as np
+import os
+
+results_folders = {"Day Peak": "Results1", "Day and Night Peaks": "Results2"}
+
+@dataclass
+class ScenarioCube:
+    output: str
+    profiles: list
+    flex: np.ndarray
+    resources: list
+    values: np.ndarray # (profile, flex %, resource, hour)
+    annual: np.ndarray # (profile, flex %, resource), NaN without AnnualSum
+
+    def axis_index(self, labels, selected):
+        # POSITIONS OF selected (A LABEL OR LIST OF LABELS) IN labels
+        if isinstance(selected, (list, tuple, np.ndarray)):
+            return [list(labels).index(label) for label in selected]
+        return list(labels).index(selected)
+
+    def sel(self, profile=None, flex=None, resource=None, annual=False):
+        # VALUES FOR THE SELECTED LABELS. A single label drops its axis, a list
+        # of labels keeps it and None keeps the whole axis
+        array = self.annual if annual else self.values
+        index = [slice(None)] * array.ndim
+
+        for axis, (labels, selected) in enumerate(
+                [(self.profiles, profile), (self.flex, flex),
+                 (self.resources, resource)]):
+            if selected is not None:
+                index[axis] = self.axis_index(labels, selected)
+
+        return array[tuple(index)]
+
+def scenario_folders(results_folders=results_folders, flex=None):
+    # FLEX % FOLDERS OF EVERY PROFILE
+    # Returns the flex percentages found in every profile, in order
+    found = []
+    for folder in results_folders.values():
+        found.append({int(name) for name in os.listdir(folder)
+                      if name.isdigit() and os.path.isdir(
+                          os.path.join(folder, name))})
+
+    common = sorted(set.intersection(*found))
+    if flex is not None:
+        common = [percent for percent in flex if percent in common]
+
+    return np.array(common)
+
+def technology_resources(technologies, results_folders=results_folders,
+                         flex=None):
+    # RESOURCES OF EACH TECHNOLOGY (e.g. 'wind'), as {technology: [resource]}
+    # From the Generators_data.csv of the first scenario
+    folder = os.path.join(next(iter(results_folders.values())),
+                          str(scenario_folders(results_folders, flex)[0]))
+    return {technology: select_resources(folder, technology)
+            for technology in technologies}
+
+def read_scenario(filename):
+    # LABELS, ANNUAL SUMS AND (resource, hour) VALUES OF ONE OUTPUT FILE
+    labelled, hours = split_time_series(read_results_csv(filename))
+    annual = labelled.loc['AnnualSum'].to_numpy(dtype=float) \
+             if 'AnnualSum' in labelled.index else None
+
+    return list(hours.columns), annual, hours.to_numpy(dtype=float).T
+
+def load_cube(output, results_folders=results_folders, flex=None, threads=8):
+    # READ output (e.g. 'power', 'curtail', 'charge') FOR EVERY SCENARIO
+    flex = scenario_folders(results_folders, flex)
+    profiles = list(results_folders)
+    filenames = [results_file(os.path.join(results_folders[profile],
+                                           str(percent)), output)
+                 for profile in profiles for percent in flex]
+
+    with ThreadPoolExecutor(threads) as pool:
+        scenarios = list(pool.map(read_scenario, filenames))
+
+    # RESOURCES: every resource of any scenario, missing ones are NaN
+    resources = list(dict.fromkeys(resource for scenario_resources, _, _
+                                   in scenarios
+                                   for resource in scenario_resources))
+    n_hours = max(values.shape[1] for _, _, values in scenarios)
+    values = np.full((len(scenarios), len(resources), n_hours), np.nan)
+    annual = np.full((len(scenarios), len(resources)), np.nan)
+
+    for i, (scenario_resources, scenario_annual, scenario_values) in \
+            enumerate(scenarios):
+        idx = [resources.index(resource) for resource in scenario_resources]
+        values[i, idx, :scenario_values.shape[1]] = scenario_values
+        if scenario_annual is not None:
+            annual[i, idx] = scenario_annual
+
+    shape = (len(profiles), len(flex))
+    return ScenarioCube(output, profiles, flex, resources,
+                        values.reshape(shape + values.shape[1:]),
+                        annual.reshape(shape + annual.shape[1:]))
+
+
+if __name__ == "__main__":
+    cube = load_cube('curtail')
+    used = load_cube('power')
+
+    # CURTAILMENT OF WIND AND SOLAR (%) FOR EVERY PROFILE AND FLEX %
+    renewables = technology_resources(['wind', 'solar'])
+    curtailed = np.stack([cube.sel(resource=resources, annual=True).sum(axis=-1)
+                          for resources in renewables.values()], axis=-1)
+    generated = np.stack([used.sel(resource=resources, annual=True).sum(axis=-1)
+                          for resources in renewables.values()], axis=-1)
+    percent = 100 * curtailed / (curtailed + generated)
+
+    for p, profile in enumerate(cube.profiles):
+        print(profile)
+        for f, flex_percent in enumerate(cube.flex):
+            print(f"  {flex_percent}%: wind {percent[p, f, 0]:.2f}%, "
+                  f"solar {percent[p, f, 1]:.2f}%")
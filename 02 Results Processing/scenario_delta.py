@@ -0,0 +1,135 @@
+'''
+Hour by hour differences between two sets of results.
+
+compare_output() aligns one output (e.g. power.csv) of results folders A and B
+on resource and timestep and computes, per resource, the totals of A and B,
+their difference (B - A), the mean and largest hourly absolute difference (and
+its hour) and the hours that differ. Both outputs are read whole, but they
+are aligned and compared chunk_hours hours at a time into running totals, so
+the aligned copies and differences of long (e.g. multi-year) outputs are never
+held for more than one chunk. A resource found in only one of A and B counts
+as zero in the other.
+
+compare_scenarios() does this for every output in delta_outputs and ranks the
+rows by relative divergence: the summed absolute hourly difference over the
+largest summed absolute value of any resource of that output in A or B (e.g.
+the Total column of power.csv). This compares outputs of different units (MW,
+$/MWh, tonnes) and keeps resources that are near zero in both (where any
+solver noise is a large share) from topping the ranking. compare_pairs()
+compares many pairs at once, by default Results1 (Day Peak) against Results2
+(Day and Night Peaks) at every flex percentage.
+'''
+
+from results_store import read_results_csv, results_file, split_time_series
+from scenario_cube import scenario_folders, results_folders
+import pandas as pd
+import numpy as np
+import sys
+import os
+
+processing_folder = os.path.dirname(os.path.abspath(__file__))
+
+delta_outputs = ['power', 'charge', 'curtail', 'nse', 'prices', 'emissions']
+chunk_hours = 1000
+tolerance = 1e-3 # smaller hourly differences are solver noise
+
+def hours_frame(folder, output):
+    # HOURLY ROWS OF AN OUTPUT, columns labelled by resource
+    _, hours = split_time_series(read_results_csv(results_file(folder, output)))
+    return hours.astype(float)
+
+def compare_output(folder_a, folder_b, output, chunk_hours=chunk_hours):
+    # PER RESOURCE DIFFERENCES OF output BETWEEN folder_a AND folder_b
+    a, b = hours_frame(folder_a, output), hours_frame(folder_b, output)
+    resources = a.columns.union(b.columns, sort=False)
+    hours = a.index.intersection(b.index, sort=False)
+
+    # ACCUMULATORS, one value per resource
+    n = len(resources)
+    total_a, total_b = np.zeros(n), np.zeros(n)
+    abs_a, abs_b, abs_delta = np.zeros(n), np.zeros(n), np.zeros(n)
+    max_delta, max_hour = np.zeros(n), np.zeros(n, dtype=int)
+    hours_differing = np.zeros(n, dtype=int)
+
+    for start in range(0, len(hours), chunk_hours):
+        # ALIGN ONE CHUNK OF HOURS ON resources
+        chunk = hours[start:start + chunk_hours]
+        chunk_a = np.nan_to_num(a.reindex(index=chunk, columns=resources)
+                                .to_numpy())
+        chunk_b = np.nan_to_num(b.reindex(index=chunk, columns=resources)
+                                .to_numpy())
+        delta = np.abs(chunk_b - chunk_a)
+
+        total_a += chunk_a.sum(axis=0)
+        total_b += chunk_b.sum(axis=0)
+        abs_a += np.abs(chunk_a).sum(axis=0)
+        abs_b += np.abs(chunk_b).sum(axis=0)
+        abs_delta += delta.sum(axis=0)
+        hours_differing += (delta > tolerance).sum(axis=0)
+
+        chunk_max = delta.max(axis=0)
+        larger = chunk_max > max_delta
+        max_delta = np.where(larger, chunk_max, max_delta)
+        max_hour = np.where(larger, start + delta.argmax(axis=0), max_hour)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        divergence = np.nan_to_num(abs_delta / max(abs_a.max(initial=0),
+                                                   abs_b.max(initial=0)))
+        delta_percent = 100 * (total_b - total_a) / np.abs(total_a)
+
+    return pd.DataFrame({
+        "output": output, "resource": resources,
+        "in": np.where(resources.isin(a.columns),
+                       np.where(resources.isin(b.columns), "both", "A"), "B"),
+        "total_A": total_a, "total_B": total_b,
+        "total_delta": total_b - total_a, "total_delta_percent": delta_percent,
+        "mean_abs_delta": abs_delta / max(len(hours), 1),
+        "max_abs_delta": max_delta,
+        "max_abs_delta_hour": hours[max_hour].str.lstrip('t').astype(int)
+                              if len(hours) else np.nan,
+        "hours_differing": hours_differing,
+        "relative_divergence": divergence})
+
+def hourly_delta(folder_a, folder_b, output):
+    # HOURLY B - A OF output, columns labelled by resource
+    a, b = hours_frame(folder_a, output), hours_frame(folder_b, output)
+    return b.sub(a, fill_value=0).dropna()
+
+def compare_scenarios(folder_a, folder_b, outputs=delta_outputs):
+    # EVERY OUTPUT OF BOTH FOLDERS, ranked by relative divergence
+    reports = [compare_output(folder_a, folder_b, output) for output in outputs
+               if os.path.exists(results_file(folder_a, output))
+               and os.path.exists(results_file(folder_b, output))]
+
+    return (pd.concat(reports, ignore_index=True)
+            .sort_values("relative_divergence", ascending=False, kind='stable')
+            .reset_index(drop=True))
+
+def compare_pairs(pairs=None, outputs=delta_outputs):
+    # EVERY PAIR OF FOLDERS IN ONE RANKED REPORT
+    # Default: Results1 against Results2 at every flex percentage
+    if pairs is None:
+        folder_a, folder_b = results_folders.values()
+        pairs = [(os.path.join(folder_a, str(percent)),
+                  os.path.join(folder_b, str(percent)))
+                 for percent in scenario_folders(results_folders)]
+
+    reports = []
+    for folder_a, folder_b in pairs:
+        report = compare_scenarios(folder_a, folder_b, outputs)
+        report.insert(0, "A", folder_a)
+        report.insert(1, "B", folder_b)
+        reports.append(report)
+
+    return (pd.concat(reports, ignore_index=True)
+            .sort_values("relative_divergence", ascending=False, kind='stable')
+            .reset_index(drop=True))
+
+
+if __name__ == "__main__":
+    # python scenario_delta.py [folder_a folder_b]
+    os.chdir(processing_folder)
+    pairs = [tuple(sys.argv[1:3])] if len(sys.argv) > 2 else None
+    report = compare_pairs(pairs)
+
+    print(report.head(20).to_string(index=False))
@@ -0,0 +1,204 @@
+'''
+Interactive explorer of the hourly load, generation and curtailment of every
+scenario.
+
+A slider picks the flex percentage and radio buttons the coordinated charging
+profile. The 8760 hour series are read once (with scenario_cube.py) and saved
+downsampled to explorer_npz:
+
+ - a daily min/max envelope (drawn as a band, so no peak is lost),
+ - an LTTB line of line_points points.
+
+Moving a widget only swaps the precomputed arrays into the existing artists
+and, on backends that support blitting, draws just those artists over a saved
+image of the axes, ticks and labels, so a redraw takes a few milliseconds.
+explorer_npz is rebuilt when any of the CSVs it was made from (or the
+downsampling) changes.
+'''
+
+from results_store import read_results_csv, results_file, file_stamp
+from scenario_cube import load_cube, results_folders
+from kpi_engine import total_load
+from downsample import minmax_envelope, lttb
+from calendar_index import month_ticks
+from matplotlib.widgets import Slider, RadioButtons
+import matplotlib.pyplot as plt
+import numpy as np
+import hashlib
+import json
+import os
+
+processing_folder = os.path.dirname(os.path.abspath(__file__))
+explorer_npz = ".explorer_series.npz"
+
+envelope_buckets = 365 # one per day
+line_points = 1000 # about one per pixel of the axes
+
+# SERIES: name -> (GenX output, resources summed, y axis label)
+# (Load_data is the load of every zone)
+series_outputs = {"Load": ("Load_data", None, "Load (GW)"),
+                  "Generation": ("power", ["Total"], "Generation (GW)"),
+                  "Curtailment": ("curtail", ["Total"],
+                                  "Wind and Solar Curtailed (GW)")}
+
+def source_files(flex, results_folders=results_folders):
+    return [results_file(os.path.join(folder, str(percent)), output)
+            for folder in results_folders.values() for percent in flex
+            for output, _, _ in series_outputs.values()]
+
+def sources_key(filenames):
+    # SIZE AND MODIFICATION TIME OF EVERY SOURCE CSV, and the downsampling
+    return hashlib.sha256(json.dumps(
+        [[filename] + file_stamp(filename) for filename in filenames]
+        + [envelope_buckets, line_points]).encode()).hexdigest()
+
+def load_series(output, resources, profiles, flex):
+    # (profile, flex %, hour) SUM OF resources
+    if output == "Load_data": # not a time series output
+        return np.array([[total_load(read_results_csv(results_file(
+            os.path.join(results_folders[profile], str(percent)), output)))
+            for percent in flex] for profile in profiles])
+
+    cube = load_cube(output, flex=list(flex))
+    return cube.sel(resource=resources).sum(axis=2)
+
+def precompute(flex=None):
+    # DOWNSAMPLED SERIES OF EVERY SCENARIO, saved to explorer_npz
+    cube = load_cube('power', flex=flex)
+    profiles, flex = cube.profiles, cube.flex
+
+    arrays = {"profiles": np.array(profiles), "flex": flex,
+              "key": np.array(sources_key(source_files(flex)))}
+    for name, (output, resources, _) in series_outputs.items():
+        if output == 'power':
+            hourly = cube.sel(resource=resources).sum(axis=2)
+        else:
+            hourly = load_series(output, resources, profiles, flex)
+        hourly = hourly / 1000 # MW to GW
+
+        days, lows, highs, _ = minmax_envelope(hourly, envelope_buckets)
+        hours, values = lttb(hourly, line_points)
+        arrays.update({f"{name}_days": days, f"{name}_low": lows,
+                       f"{name}_high": highs, f"{name}_hours": hours,
+                       f"{name}_line": values,
+                       f"{name}_total": hourly.sum(axis=-1) / 1000}) # TWh
+
+    np.savez(explorer_npz, **arrays)
+    return arrays
+
+def explorer_series(flex=None):
+    # PRECOMPUTED SERIES, rebuilt if a source CSV changed
+    os.chdir(processing_folder)
+    if os.path.exists(explorer_npz):
+        with np.load(explorer_npz) as saved:
+            arrays = dict(saved)
+        try:
+            if str(arrays["key"]) == sources_key(source_files(arrays["flex"])) \
+                    and (flex is None or list(arrays["flex"]) == list(flex)):
+                return arrays
+        except FileNotFoundError:
+            pass
+
+    return precompute(flex)
+
+def band_vertices(days, lows, highs):
+    # POLYGON OF A fill_between BAND
+    return np.column_stack([np.concatenate([days, days[::-1]]),
+                            np.concatenate([lows, highs[::-1]])])
+
+def explorer(arrays=None):
+    # FIGURE WITH A FLEX % SLIDER AND PROFILE BUTTONS
+    if arrays is None:
+        arrays = explorer_series()
+    profiles = [str(profile) for profile in arrays["profiles"]]
+    flex = list(arrays["flex"])
+
+    fig, axes = plt.subplots(len(series_outputs), 1, sharex=True,
+                             figsize=(14, 8))
+    fig.subplots_adjust(left=0.06, right=0.82, bottom=0.14, top=0.93,
+                        hspace=0.15)
+
+    # ARTISTS: made once, their data is replaced on every change
+    bands, lines, labels = {}, {}, {}
+    for ax, (name, (_, _, ylabel)) in zip(axes, series_outputs.items()):
+        high = arrays[f"{name}_high"].max()
+        bands[name] = ax.fill_between(arrays[f"{name}_days"],
+                                      arrays[f"{name}_low"][0, 0],
+                                      arrays[f"{name}_high"][0, 0],
+                                      alpha=0.3, color='darkturquoise',
+                                      linewidth=0, label='Daily min to max',
+                                      animated=True)
+        lines[name], = ax.plot(arrays[f"{name}_hours"][0, 0],
+                               arrays[f"{name}_line"][0, 0],
+                               color='teal', linewidth=0.5, label='Hourly',
+                               animated=True)
+        labels[name] = ax.text(1.01, 0.5, '', transform=ax.transAxes,
+                               va='center', animated=True)
+        ax.set_ylabel(ylabel)
+        ax.set_ylim(0, max(high * 1.05, 1e-3))
+
+    axes[0].legend(loc='upper left', ncol=2)
+    axes[-1].set_xlim(0, 8760)
+    month_hours, months = month_ticks()
+    axes[-1].set_xticks(month_hours)
+    axes[-1].set_xticklabels(months)
+    axes[-1].set_xlabel('Month')
+    # The widgets show the selected scenario, so the title doesn't change
+    fig.suptitle('2050 Hourly Load, Generation and Curtailment')
+    animated = [artist for artists in (bands, lines, labels)
+                for artist in artists.values()]
+
+    # WIDGETS
+    slider_ax = fig.add_axes([0.12, 0.03, 0.5, 0.03])
+    flex_slider = Slider(slider_ax, 'Flex %', flex[0], flex[-1], valinit=flex[0],
+                         valstep=flex, valfmt='%d%%')
+    flex_slider.drawon = False # drawn in update()
+    radio_ax = fig.add_axes([0.84, 0.01, 0.15, 0.09], frameon=False)
+    profile_buttons = RadioButtons(radio_ax, profiles)
+
+    # BLITTING: image of everything apart from the animated artists, saved
+    # after every full draw (e.g. a resize)
+    background = {}
+
+    def draw_animated():
+        for artist in animated:
+            fig.draw_artist(artist)
+
+    def save_background(_):
+        background["image"] = fig.canvas.copy_from_bbox(fig.bbox)
+        draw_animated()
+
+    fig.canvas.mpl_connect('draw_event', save_background)
+
+    def update(_=None):
+        p = profiles.index(profile_buttons.value_selected)
+        f = flex.index(int(flex_slider.val))
+
+        for name in series_outputs:
+            bands[name].set_verts([band_vertices(arrays[f"{name}_days"],
+                                                 arrays[f"{name}_low"][p, f],
+                                                 arrays[f"{name}_high"][p, f])])
+            lines[name].set_data(arrays[f"{name}_hours"][p, f],
+                                 arrays[f"{name}_line"][p, f])
+            labels[name].set_text(f"{arrays[f'{name}_total'][p, f]:.2f} TWh")
+
+        if fig.canvas.supports_blit and "image" in background:
+            fig.canvas.restore_region(background["image"])
+            fig.draw_artist(slider_ax)
+            draw_animated()
+            fig.canvas.blit(fig.bbox)
+        else:
+            fig.canvas.draw_idle()
+
+    flex_slider.on_changed(update)
+    profile_buttons.on_clicked(update)
+    update()
+
+    # The widgets stop responding if they are garbage collected
+    fig.explorer_widgets = (flex_slider, profile_buttons)
+    return fig
+
+
+if __name__ == "__main__":
+    explorer()
+    plt.show()